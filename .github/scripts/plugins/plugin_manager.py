@@ -5,14 +5,13 @@ import os
 import sys
 import json
 import shutil
+import tomllib
 import argparse
 import subprocess
 import importlib.util
 from typing import Any, TypedDict
 from pathlib import Path
 
-import toml
-
 
 class PluginInfo(TypedDict):
   package_name: str
@@ -30,8 +29,8 @@ class PluginManager:
     for config_path in [Path("ezpz.toml"), Path("pyproject.toml")]:
       if config_path.exists():
         try:
-          with config_path.open("r") as f:
-            config = toml.load(f)
+          with config_path.open("rb") as f:
+            config = tomllib.load(f)
           return config.get("ezpz_pluginz", config.get("tool", {}).get("ezpz", {}))
         except Exception as e:
           print(f"❌ Error loading {config_path}: {e}")
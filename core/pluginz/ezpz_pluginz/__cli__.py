@@ -14,7 +14,6 @@ from ezpz_pluginz.registry import (
   REGISTRY_URL,
   LOCAL_REGISTRY_DIR,
   LOCAL_REGISTRY_FILE,
-  PluginRegistryAPI,
   LocalPluginRegistry,
   find_plugin_in_path,
   is_package_installed,
@@ -29,6 +28,8 @@ app.add_typer(typer_instance=registry_app, name="registry")
 
 logger = setup_logger("CLI")
 
+PRELOWERED_FIELDS = frozenset({"name", "package_name"})
+
 
 def get_auth_secret() -> str:
   pat = os.getenv("AUTH_SECRET")
@@ -172,6 +173,8 @@ def find(
 
   if search_remote:
     try:
+      from ezpz_pluginz.registry.reg.remote import PluginRegistryAPI  # noqa: PLC0415
+
       api = PluginRegistryAPI()
       remote_results = api.search_plugins(keyword)
       if search_field != "all":
@@ -193,6 +196,8 @@ def health() -> None:
 
   Verifies connectivity and status of the central plugin registry server.
   """
+  from ezpz_pluginz.registry.reg.remote import PluginRegistryAPI  # noqa: PLC0415
+
   remote_reg = PluginRegistryAPI()
   try:
     response = remote_reg.check_health()
@@ -220,8 +225,8 @@ def register(
     raise typer.Exit(1)
 
   local_registry = LocalPluginRegistry()
-  if not local_registry.fetch_and_update_registry():
-    logger.warning("Failed to refresh local plugin registry, continuing with cached data")
+  # the registry is revalidated while the plugin is located and loaded from disk
+  refresh = local_registry.refresh_in_background()
 
   plugin_info = find_plugin_in_path(plugin_path, config.include_str_paths)
   if plugin_info is None:
@@ -230,18 +235,20 @@ def register(
     logger.info(f"Searched in configured include paths: {config.include_str_paths}")
     raise typer.Exit(1)
 
+  if not refresh.result():
+    logger.warning("Failed to refresh local plugin registry, continuing with cached data")
+
   if local_registry.is_plugin_registered(plugin_info.name):
     logger.info(f"Plugin '{plugin_info.name}' is already registered")
     logger.info("Skipping registration")
     return
 
   auth_secret = get_auth_secret()
-  api = PluginRegistryAPI()
-  success = api.register_plugin(plugin_info, auth_secret)
+  success = local_registry.api.register_plugin(plugin_info, auth_secret)
 
   if success:
     logger.info(f"Successfully registered '{plugin_info.name}'")
-    local_registry.fetch_and_update_registry()
+    local_registry.fetch_and_update_registry(force=True)
   else:
     logger.error(f"Failed to register '{plugin_info.name}'")
     raise typer.Exit(1)
@@ -278,14 +285,13 @@ def update_plugin(
     logger.info("Try running 'ezpz registry refresh' to update the local registry")
     raise typer.Exit(1)
 
-  api = PluginRegistryAPI()
   logger.info(f"Updating plugin: {plugin_info.name}")
   plugin_update = PluginUpdate(**plugin_info.model_dump())
-  success = api.update_plugin(existing_plugin.id, plugin_update, auth_secret)
+  success = local_registry.api.update_plugin(existing_plugin.id, plugin_update, auth_secret)
 
   if success:
     logger.info(f"Successfully updated '{plugin_info.name}'")
-    local_registry.fetch_and_update_registry()
+    local_registry.fetch_and_update_registry(force=True)
   else:
     logger.error(f"Failed to update '{plugin_info.name}'")
     raise typer.Exit(1)
@@ -302,7 +308,7 @@ def refresh() -> None:
   """
   logger.info("Refreshing local plugin registry...")
   registry = LocalPluginRegistry()
-  if registry.fetch_and_update_registry():
+  if registry.fetch_and_update_registry(force=True):
     logger.info("Local plugin registry refreshed successfully")
   else:
     raise typer.Exit(1)
@@ -365,7 +371,7 @@ def delete_plugin(_id: str = typer.Argument(help="The ID of the plugin to be del
   Removes the plugin from the local cache after successful remote deletion.
   """
   local_registry = LocalPluginRegistry()
-  remote_registry = PluginRegistryAPI()
+  remote_registry = local_registry.api
   pat = get_auth_secret()
   try:
     try:
@@ -385,7 +391,7 @@ def delete_plugin(_id: str = typer.Argument(help="The ID of the plugin to be del
         plugin = remote_registry.get_plugin(_id)
         local_registry.remove_plugin_from_local_registry(plugin=plugin)
       except Exception:
-        local_registry.fetch_and_update_registry()
+        local_registry.fetch_and_update_registry(force=True)
   except Exception as e:
     logger.exception("Failed to delete plugin")
     raise typer.Exit(1) from e
@@ -412,6 +418,9 @@ def should_include_plugin(plugin: dict[str, Any], search_keyword: str, field: st
   def get_field_value(plugin: dict[str, Any], field_name: str) -> str:
     if field_name == "package":
       field_name = "package_name"
+    # name and package_name are lowercased once per plugin on the model
+    if not case_sensitive and field_name in PRELOWERED_FIELDS:
+      return getattr(plugin, f"{field_name}_lower")
 
     value = getattr(plugin, field_name, "") or ""
     if not case_sensitive:
@@ -419,11 +428,9 @@ def should_include_plugin(plugin: dict[str, Any], search_keyword: str, field: st
     return value
 
   def get_aliases_text(plugin: dict[str, Any]) -> str:
-    aliases = getattr(plugin, "aliases", []) or []
-    text = " ".join(aliases)
     if not case_sensitive:
-      text = text.lower()
-    return text
+      return " ".join(plugin.aliases_lower)
+    return " ".join(getattr(plugin, "aliases", []) or [])
 
   def matches_text(text: str, keyword: str, *, exact: bool) -> bool:
     if exact:
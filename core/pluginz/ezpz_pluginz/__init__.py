@@ -1,24 +1,124 @@
+import os
 import sys
+import json
 import shutil
+import hashlib
 import inspect
+import functools
 import importlib
+from typing import TYPE_CHECKING
 from pathlib import Path
-from itertools import chain
-
-import libcst as cst
+from itertools import chain, repeat
+from concurrent.futures import ProcessPoolExecutor
 
 from ezpz_pluginz.logger import setup_logger
-from ezpz_pluginz.lockfile import EZPZ_TOML_FILENAME, EZPZ_PROJECT_LOCKFILE_FILENAME, PolarsPluginLockfilePD
-from ezpz_pluginz.toml_schema import EzpzPluginConfig
+from ezpz_pluginz.toml_schema import EZPZ_TOML_FILENAME, EZPZ_PROJECT_LOCKFILE_FILENAME, EzpzPluginConfig
 from ezpz_pluginz.e_polars_namespace import EPolarsNS
-from ezpz_pluginz.register_plugin_macro import PluginPatcher
+
+if TYPE_CHECKING:
+  from ezpz_pluginz.register_plugin_macro import PolarsPluginMacroMetadataPD
 
 logger = setup_logger("ENTRY")
 
+PATCH_HASHES_FILENAME = ".hashes.json"
+
+_PY_SITE = f"python{sys.version_info.major}.{sys.version_info.minor}"
+
+
+@functools.cache
+def _venv_site_packages() -> Path | None:
+  if hasattr(sys, "real_prefix") or (hasattr(sys, "base_prefix") and sys.base_prefix != sys.prefix):
+    return Path(sys.prefix, "lib", _PY_SITE, "site-packages")
+  return None
+
+
+def _remove_patched_dir(patched_dir: Path) -> None:
+  # .patched only ever holds flat files written by mount_plugins
+  try:
+    with os.scandir(patched_dir) as it:
+      for entry in it:
+        os.unlink(entry.path)  # noqa: PTH108
+    patched_dir.rmdir()
+  except OSError:
+    shutil.rmtree(patched_dir)
+
+
+def _digest(data: bytes) -> str:
+  return hashlib.blake2b(data).hexdigest()
+
+
+def _file_digest(path: Path) -> str | None:
+  try:
+    return _digest(path.read_bytes())
+  except OSError:
+    return None
+
+
+def _is_mount_current(patched_dir: Path, lockfile_hash: str, targets: list[Path]) -> bool:
+  # a mount is current when it was produced from the same lockfile, covers every target,
+  # and none of the files it wrote (targets and their .patched copies) was modified or removed since
+  try:
+    state = json.loads((patched_dir / PATCH_HASHES_FILENAME).read_bytes())
+  except (OSError, ValueError):
+    return False
+  if state.get("lockfile") != lockfile_hash:
+    return False
+  file_hashes: dict[str, str] = state.get("files", {})
+  if not all(str(target) in file_hashes for target in targets):
+    return False
+  return all(_file_digest(Path(path)) == file_hash for path, file_hash in file_hashes.items())
+
+
+def _save_patch_hashes(patched_dir: Path, lockfile_hash: str, file_hashes: dict[str, str]) -> None:
+  (patched_dir / PATCH_HASHES_FILENAME).write_text(json.dumps({"lockfile": lockfile_hash, "files": file_hashes}, indent=2))
+
+
+def _patched_file_hashes(patched_dir: Path, ns_filepaths: dict[str, Path], patched_sources: list[bytes]) -> dict[str, str]:
+  # each patched namespace lives both in polars and as its .patched copy, both are recorded
+  file_hashes: dict[str, str] = {}
+  for (ns, filepath), new_code in zip(ns_filepaths.items(), patched_sources, strict=True):
+    file_hashes[str(filepath)] = file_hashes[str(patched_dir / f"{ns.lower()}.py")] = _digest(new_code)
+  return file_hashes
+
+
+# pure function of its arguments so namespaces can be patched in worker processes
+def _patch_one(ns: str, filepath: Path, polars_ns_to_plugins: dict[str, set["PolarsPluginMacroMetadataPD"]], patched_dir: Path) -> bytes:
+  logger.info(f"Preparing to patch polars namespace {ns}...")
+  backup_path = filepath.with_suffix(".bak")
+  ext = ".bak" if backup_path.is_file() else ".py"
+  source_code = filepath.with_suffix(ext).read_text()
+
+  if not backup_path.is_file():
+    logger.info("Creating backup of polars file...")
+    backup_path.write_text(source_code)
+  else:
+    logger.info("Backup file already exists")
+
+  # libcst is only needed to patch, importing the package (e.g. for the CLI) must not load it
+  import libcst as cst  # noqa: PLC0415
+
+  from ezpz_pluginz.register_plugin_macro import PluginPatcher  # noqa: PLC0415
+
+  module = cst.parse_module(source_code)
+  wrapper = cst.MetadataWrapper(module)
+
+  logger.info("Patching...")
+  new_code = wrapper.visit(PluginPatcher(polars_ns_to_plugins)).code.encode()
+
+  logger.info("Saving...")
+  filepath.write_bytes(new_code)
+
+  local_copy_path = patched_dir / f"{ns.lower()}.py"
+  local_copy_path.write_bytes(new_code)
+
+  logger.info(f"Patched copy saved to {local_copy_path}")
+  return new_code
+
 
 def mount_plugins() -> None:
+  cwd = Path.cwd()
   ezpz_pluginz_config = None
-  ezpz_toml_path = Path.cwd().joinpath(EZPZ_TOML_FILENAME)
+  ezpz_toml_path = cwd.joinpath(EZPZ_TOML_FILENAME)
 
   if ezpz_toml_path.exists():
     try:
@@ -26,75 +126,68 @@ def mount_plugins() -> None:
     except Exception as e:
       logger.warning(f"Failed to load ezpz.toml: {e}")
   else:
-    pyproject_toml_path = Path.cwd().joinpath("pyproject.toml")
+    pyproject_toml_path = cwd.joinpath("pyproject.toml")
     if pyproject_toml_path.exists():
       try:
         ezpz_pluginz_config = EzpzPluginConfig.from_toml_path(pyproject_toml_path)
       except Exception as e:
         logger.warning(f"Failed to load pyproject.toml: {e}")
 
-  lockfile = PolarsPluginLockfilePD.generate()
-  lockfile.to_yaml_file(Path(EZPZ_PROJECT_LOCKFILE_FILENAME))
+  from ezpz_pluginz.lockfile import PolarsPluginLockfilePD  # noqa: PLC0415
+
+  lockfile = PolarsPluginLockfilePD.generate(cwd, ezpz_pluginz_config)
+  lockfile.to_yaml_file(cwd / EZPZ_PROJECT_LOCKFILE_FILENAME)
 
   # plugin-level lock files using the same lockfile data
   lockfile.generate_and_save_plugin_lockfiles()
 
   polars_ns_to_plugins = dict(chain(lockfile.project_plugins.items(), lockfile.site_plugins.items()))
-  pp = PluginPatcher(polars_ns_to_plugins)
 
   polars_module = importlib.import_module("polars")
-  patched_dir = Path.cwd() / ".patched"
+  patched_dir = cwd / ".patched"
   patched_dir.mkdir(exist_ok=True)
-
-  for ns in polars_ns_to_plugins:
-    logger.info(f"Preparing to patch polars namespace {ns}...")
-    filepath = Path(inspect.getfile(getattr(polars_module, ns)))
-    backup_path = filepath.with_suffix(".bak")
-    ext = ".bak" if backup_path.is_file() else ".py"
-    source_code = filepath.with_suffix(ext).read_text()
-
-    if not backup_path.is_file():
-      logger.info("Creating backup of polars file...")
-      backup_path.write_text(source_code)
-    else:
-      logger.info("Backup file already exists")
-
-    module = cst.parse_module(source_code)
-    wrapper = cst.MetadataWrapper(module)
-
-    logger.info("Patching...")
-    new_code = wrapper.visit(pp).code
-
-    logger.info("Saving...")
-    filepath.write_text(new_code)
-
-    local_copy_path = patched_dir / f"{ns.lower()}.py"
-    local_copy_path.write_text(new_code)
-
-    logger.info(f"Patched copy saved to {local_copy_path}")
+  ns_filepaths = {ns: Path(inspect.getfile(getattr(polars_module, ns))) for ns in polars_ns_to_plugins}
 
   should_generate_sitecustomize = (
     (ezpz_pluginz_config and ezpz_pluginz_config.site_customize)
     or (ezpz_pluginz_config is None and (lockfile.project_plugins or lockfile.site_plugins))  # Remote-only plugins
   )
+  venv_site_path = _venv_site_packages() if should_generate_sitecustomize else None
+  sitecustomize_path = venv_site_path.joinpath("sitecustomize.py") if venv_site_path is not None and venv_site_path.exists() else None
+
+  # warm mounts: nothing changed since the last run, skip the libcst parse + rewrite entirely
+  lockfile_hash = lockfile.content_hash()
+  targets = [*ns_filepaths.values(), *([sitecustomize_path] if sitecustomize_path is not None else [])]
+  if _is_mount_current(patched_dir, lockfile_hash, targets):
+    logger.info("Plugins are already mounted and up to date")
+    return
+
+  # libcst holds the GIL while parsing, so independent namespaces are patched in separate processes
+  workers = min(len(ns_filepaths), os.cpu_count() or 1)
+  if workers > 1:
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+      patched_sources = list(
+        executor.map(_patch_one, ns_filepaths.keys(), ns_filepaths.values(), repeat(polars_ns_to_plugins), repeat(patched_dir)),
+      )
+  else:
+    patched_sources = [_patch_one(ns, filepath, polars_ns_to_plugins, patched_dir) for ns, filepath in ns_filepaths.items()]
+  file_hashes = _patched_file_hashes(patched_dir, ns_filepaths, patched_sources)
 
   if should_generate_sitecustomize:
-    if hasattr(sys, "real_prefix") or (hasattr(sys, "base_prefix") and sys.base_prefix != sys.prefix):
-      venv_site_path = Path(sys.prefix) / "lib" / f"python{sys.version_info.major}.{sys.version_info.minor}" / "site-packages"
-    else:
+    if venv_site_path is None:
       logger.warning("WARNING: The system python is executing, running ezpz plugins sitecustomize registry mounting is not advised.")
-      return
+    elif sitecustomize_path is not None:
+      sitecustomize_code = lockfile.generate_registry().encode()
+      sitecustomize_path.write_bytes(sitecustomize_code)
+      file_hashes[str(sitecustomize_path)] = file_hashes[str(patched_dir / "sitecustomize.py")] = _digest(sitecustomize_code)
 
-    if venv_site_path.exists():
-      sitecustomize_code = lockfile.generate_registry()
-      sitecustomize_path = venv_site_path.joinpath("sitecustomize.py")
-      sitecustomize_path.write_text(sitecustomize_code)
-
-      (patched_dir / "sitecustomize.py").write_text(sitecustomize_code)
+      (patched_dir / "sitecustomize.py").write_bytes(sitecustomize_code)
       logger.info(f"sitecustomize.py saved to {patched_dir / 'sitecustomize.py'}")
   else:
     logger.info("Sitecustomize generation skipped - no plugins found or not explicitly enabled")
 
+  _save_patch_hashes(patched_dir, lockfile_hash, file_hashes)
+
 
 def unmount_plugins() -> None:
   polars_module = importlib.import_module("polars")
@@ -105,9 +198,8 @@ def unmount_plugins() -> None:
       filepath.write_text(backup_path.read_text())
       backup_path.unlink()
 
-  if hasattr(sys, "real_prefix") or (hasattr(sys, "base_prefix") and sys.base_prefix != sys.prefix):
-    venv_site_path = Path(sys.prefix) / "lib" / f"python{sys.version_info.major}.{sys.version_info.minor}" / "site-packages"
-  else:
+  venv_site_path = _venv_site_packages()
+  if venv_site_path is None:
     logger.warning("WARNING: The system python is executing, running ezpz plugins sitecustomize registry mouting is not advised.")
     return
 
@@ -118,5 +210,5 @@ def unmount_plugins() -> None:
 
   patched_dir = Path.cwd() / ".patched"
   if patched_dir.exists():
-    shutil.rmtree(patched_dir)
+    _remove_patched_dir(patched_dir)
     logger.info(f"Removed .patched directory: {patched_dir}")
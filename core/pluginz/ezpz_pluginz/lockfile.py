@@ -1,16 +1,20 @@
+import sys
+import hashlib
 import logging
+import functools
 import importlib
 import contextlib
 import importlib.util
 import importlib.metadata
-from typing import Self, Iterable
+from typing import Any, Self, Iterable
 from pathlib import Path
 from operator import attrgetter
-from itertools import chain, groupby
+from functools import cached_property
+from itertools import groupby
 
 import yaml
 from jinja2 import Template
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from ezpz_pluginz.toml_schema import EzpzPluginConfig
 from ezpz_pluginz.register_plugin_macro import PolarsPluginMacroMetadataPD
@@ -21,6 +25,21 @@ EZPZ_TOML_FILENAME = "ezpz.toml"
 EZPZ_PROJECT_LOCKFILE_FILENAME = "ezpz-lock.yaml"
 EZPZ_PLUGIN_LOCKFILE_FILENAME = "ezpz-lock.yml"
 
+# libyaml bindings are optional in PyYAML builds, fall back to the pure-Python implementations
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+# installed distributions only change when sys.path does, so their metadata is scanned once per path layout
+@functools.lru_cache(maxsize=1)
+def _ezpz_dependent_origins(_sys_path: tuple[str, ...]) -> tuple[Path | None, ...]:
+  origins: list[Path | None] = []
+  for dist in importlib.metadata.distributions():
+    if "ezpz-pluginz" in (dist.requires or []):
+      spec = importlib.util.find_spec(dist.metadata["Name"].replace("-", "_"))
+      origins.append(Path(spec.origin) if spec and spec.origin else None)
+  return tuple(origins)
+
 
 def group_models_by_key[T: BaseModel](data: Iterable[T], key: str) -> dict[str, set[T]]:
   sorted_data = sorted(data, key=attrgetter(key))
@@ -28,28 +47,34 @@ def group_models_by_key[T: BaseModel](data: Iterable[T], key: str) -> dict[str,
 
 
 class PolarsPluginLockfilePD(BaseModel):
+  model_config = ConfigDict(frozen=True)
+
   project_plugins: dict[str, set[PolarsPluginMacroMetadataPD]]
   site_plugins: dict[str, set[PolarsPluginMacroMetadataPD]]
 
   @classmethod
-  def generate(cls) -> "PolarsPluginLockfilePD":
-    logger.debug(f"cwd: {Path.cwd()}")
+  def generate(cls, cwd: Path | None = None, config: EzpzPluginConfig | None = None) -> "PolarsPluginLockfilePD":
+    cwd = cwd or Path.cwd()
+    logger.debug("cwd: %s", cwd)
 
     # Initialize empty project and site plugins
     project_plugins = dict[str, set[PolarsPluginMacroMetadataPD]]()
     site_plugins = dict[str, set[PolarsPluginMacroMetadataPD]]()
-    project_entry = cls(project_plugins=project_plugins, site_plugins=site_plugins)
 
     # Try to load project plugins from ezpz.toml or pyproject.toml
-    project_ezpz_toml_path = Path.cwd().joinpath(EZPZ_TOML_FILENAME)
-    pyproject_toml_path = Path.cwd().joinpath("pyproject.toml")
+    project_ezpz_toml_path = cwd.joinpath(EZPZ_TOML_FILENAME)
+    pyproject_toml_path = cwd.joinpath("pyproject.toml")
 
     try:
-      if project_ezpz_toml_path.exists():
-        project_entry.project_plugins = EzpzPluginConfig.get_plugins(project_ezpz_toml_path)
-        logger.debug(f"Loaded plugins from {EZPZ_TOML_FILENAME}")
+      if config is not None:
+        # the caller already parsed the project config, don't read and parse it a second time
+        project_plugins = config.collect_plugins()
+        logger.debug("Loaded plugins from the provided config")
+      elif project_ezpz_toml_path.exists():
+        project_plugins = EzpzPluginConfig.get_plugins(project_ezpz_toml_path)
+        logger.debug("Loaded plugins from %s", EZPZ_TOML_FILENAME)
       elif pyproject_toml_path.exists():
-        project_entry.project_plugins = EzpzPluginConfig.get_plugins(pyproject_toml_path)
+        project_plugins = EzpzPluginConfig.get_plugins(pyproject_toml_path)
         logger.debug("Loaded plugins from pyproject.toml")
       else:
         logger.info("No local config found. Checking for remote plugins only.")
@@ -62,89 +87,110 @@ class PolarsPluginLockfilePD(BaseModel):
     processed_lockfiles: set[Path] = set()
     has_ezpz_pluginz_dep = False
 
-    for dist in importlib.metadata.distributions():
-      if "ezpz-pluginz" in (dist.requires or []):
-        has_ezpz_pluginz_dep = True
-        spec = importlib.util.find_spec(dist.metadata["Name"].replace("-", "_"))
-        if spec and spec.origin:
-          patch_file = Path(spec.origin).with_name(EZPZ_PLUGIN_LOCKFILE_FILENAME)
+    for origin in _ezpz_dependent_origins(tuple(sys.path)):
+      has_ezpz_pluginz_dep = True
+      if origin is not None:
+        patch_file = origin.with_name(EZPZ_PLUGIN_LOCKFILE_FILENAME)
 
-          if patch_file.exists() and patch_file not in processed_lockfiles:
-            try:
-              site_plugin_data = cls.from_yaml_file(patch_file)
-
-              for ns, plugins in site_plugin_data.project_plugins.items():
-                if ns not in project_entry.project_plugins:
-                  if ns not in project_entry.site_plugins:
-                    project_entry.site_plugins[ns] = set()
-                  project_entry.site_plugins[ns].update(plugins)
-                else:
-                  logger.debug(f"Skipping site plugins for {ns} - already loaded as project plugins")
-
-              processed_lockfiles.add(patch_file)
-              logger.debug(f"Loaded site plugins from {patch_file}")
-            except Exception as e:
-              logger.warning(f"Failed to load site plugins from {patch_file}: {e}")
-
-    if not project_entry.project_plugins and not project_entry.site_plugins:
+        if patch_file.exists() and patch_file not in processed_lockfiles:
+          try:
+            site_plugin_data = cls.from_yaml_file(patch_file)
+            site_ns_plugins = site_plugin_data.project_plugins
+
+            # namespaces already provided by the project take precedence over site plugins
+            new_ns = site_ns_plugins.keys() - project_plugins.keys()
+            for ns in new_ns:
+              site_plugins.setdefault(ns, set()).update(site_ns_plugins[ns])
+            for ns in site_ns_plugins.keys() - new_ns:
+              logger.debug("Skipping site plugins for %s - already loaded as project plugins", ns)
+
+            processed_lockfiles.add(patch_file)
+            logger.debug("Loaded site plugins from %s", patch_file)
+          except Exception as e:
+            logger.warning(f"Failed to load site plugins from {patch_file}: {e}")
+
+    if not project_plugins and not site_plugins:
       if not has_ezpz_pluginz_dep:
         logger.error("No plugins found and no distributions depend on ezpz-pluginz.")
         msg = "No plugins or ezpz-pluginz dependencies found."
         raise ValueError(msg)
       logger.warning("Found ezpz-pluginz dependencies but no plugin lockfiles were loaded.")
 
-    return project_entry
+    return cls(project_plugins=project_plugins, site_plugins=site_plugins)
 
   def generate_registry(self) -> str:
     imports = list[str]()
     registry = list[str]()
-    for plugin in chain(chain.from_iterable(self.project_plugins.values()), chain.from_iterable(self.site_plugins.values())):
-      imports.append(plugin.import_)
-      registry.append(plugin.registery_entry())
-    return Template(Path(__file__).parent.joinpath("templates", "sitecustomize.py.j2").read_text()).render(imports=imports, registry=registry)
+    for bucket in (self.project_plugins, self.site_plugins):
+      for plugin_set in bucket.values():
+        imports.extend(plugin.import_ for plugin in plugin_set)
+        registry.extend(PolarsPluginMacroMetadataPD.registry_entries_bulk(plugin_set))
+    # plugins sharing a module would otherwise emit the same import line several times
+    unique_imports = list(dict.fromkeys(imports))
+    return Template(Path(__file__).parent.joinpath("templates", "sitecustomize.py.j2").read_text()).render(imports=unique_imports, registry=registry)
+
+  # the model is frozen, so the dumped tree and its YAML rendering can be computed once
+  @cached_property
+  def _dumped(self) -> dict[str, Any]:
+    return self.model_dump(mode="json")
+
+  @cached_property
+  def _yaml_bytes(self) -> bytes:
+    return self.to_yaml().encode()
 
   def to_yaml(self) -> str:
-    return yaml.safe_dump(self.model_dump(mode="json"), sort_keys=False)
+    return yaml.dump(self._dumped, Dumper=YAML_DUMPER, sort_keys=False)
+
+  def content_hash(self) -> str:
+    return hashlib.blake2b(self._yaml_bytes).hexdigest()
 
   @classmethod
   def from_yaml(cls, content: str) -> Self:
-    return cls.model_validate(yaml.safe_load(content))
+    return cls.model_validate(yaml.load(content, Loader=YAML_LOADER))  # noqa: S506
 
   @classmethod
   def from_yaml_file(cls, lockfile_path: "Path") -> Self:
-    return cls.from_yaml(lockfile_path.read_text())
+    with lockfile_path.open("rb") as f:
+      return cls.model_validate(yaml.load(f, Loader=YAML_LOADER))  # noqa: S506
 
-  def to_yaml_file(self, lockfile_path: "Path") -> None:
-    lockfile_path.write_text(self.to_yaml())
+  def to_yaml_file(self, lockfile_path: "Path") -> bool:
+    # skip the disk write when the lockfile already holds the same content; the size check avoids reading a changed file
+    yaml_bytes = self._yaml_bytes
+    try:
+      unchanged = lockfile_path.stat().st_size == len(yaml_bytes) and lockfile_path.read_bytes() == yaml_bytes
+    except OSError:
+      unchanged = False
+    if unchanged:
+      logger.debug("Lockfile %s is up to date", lockfile_path)
+      return False
+    lockfile_path.write_bytes(yaml_bytes)
+    return True
 
   def generate_and_save_plugin_lockfiles(self) -> None:
     if not self.project_plugins:
       logger.debug("No project plugins found, skipping plugin-level lock file generation")
       return
 
-    for dist in importlib.metadata.distributions():
-      if "ezpz-pluginz" in (dist.requires or []):
-        spec = importlib.util.find_spec(dist.metadata["Name"].replace("-", "_"))
-        if spec and spec.origin:
-          plugin_module_path = Path(spec.origin)
-          plugin_lockfile_path = plugin_module_path.with_name(EZPZ_PLUGIN_LOCKFILE_FILENAME)
+    for plugin_module_path in _ezpz_dependent_origins(tuple(sys.path)):
+      if plugin_module_path is not None:
+        plugin_lockfile_path = plugin_module_path.with_name(EZPZ_PLUGIN_LOCKFILE_FILENAME)
 
-          try:
-            # plugins specific to this distribution/package
-            plugin_specific_plugins = self._get_plugins_for_package(plugin_module_path.parent)
-
-            if plugin_specific_plugins:
-              plugin_lockfile_data = PolarsPluginLockfilePD(
-                project_plugins=plugin_specific_plugins,
-                site_plugins={},
-              )
-
-              plugin_lockfile_data.to_yaml_file(plugin_lockfile_path)
-              logger.info(f"Generated plugin-level lock file: {plugin_lockfile_path}")
-            else:
-              logger.debug(f"No plugins found for package at {plugin_module_path.parent}")
-          except Exception as e:
-            logger.warning(f"Failed to generate plugin-level lock file at {plugin_lockfile_path}: {e}")
+        try:
+          # plugins specific to this distribution/package
+          plugin_specific_plugins = self._get_plugins_for_package(plugin_module_path.parent)
+
+          if plugin_specific_plugins:
+            plugin_lockfile_data = PolarsPluginLockfilePD(
+              project_plugins=plugin_specific_plugins,
+              site_plugins={},
+            )
+
+            plugin_lockfile_data.to_yaml_file(plugin_lockfile_path)
+            logger.info(f"Generated plugin-level lock file: {plugin_lockfile_path}")
+          else:
+            logger.debug("No plugins found for package at %s", plugin_module_path.parent)
+        except Exception as e:
+          logger.warning(f"Failed to generate plugin-level lock file at {plugin_lockfile_path}: {e}")
 
   def _get_plugins_for_package(self, package_path: Path) -> dict[str, set[PolarsPluginMacroMetadataPD]]:
     package_plugins: dict[str, set[PolarsPluginMacroMetadataPD]] = {}
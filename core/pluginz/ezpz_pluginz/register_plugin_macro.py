@@ -1,5 +1,5 @@
 import logging
-from typing import TYPE_CHECKING, Any, Unpack, Callable, Sequence, TypedDict, cast
+from typing import TYPE_CHECKING, Any, Self, Unpack, Callable, Iterable, Sequence, TypedDict, cast
 
 import libcst as cst
 import libcst.matchers as m
@@ -15,6 +15,9 @@ if TYPE_CHECKING:
   from ezpz_pluginz.register_plugin_macro import PolarsPluginMacroMetadataPD
 
 
+REGISTRY_ENTRY_TEMPLATE = "pl.api.{}('{}')({})"
+
+
 class InvalidNamespaceError(Exception):
   def __init__(self) -> None:
     super().__init__("PANIC!")
@@ -41,7 +44,12 @@ class PolarsPluginMacroMetadataPD(BaseModel):
   type_hint: str
 
   def registery_entry(self) -> str:
-    return f"pl.api.{self.polars_ns.api_decorator}('{self.attr_name}')({self.type_hint})"
+    return REGISTRY_ENTRY_TEMPLATE.format(self.polars_ns.api_decorator, self.attr_name, self.type_hint)
+
+  @classmethod
+  def registry_entries_bulk(cls, plugins: Iterable[Self]) -> list[str]:
+    fmt = REGISTRY_ENTRY_TEMPLATE.format
+    return [fmt(p.polars_ns.api_decorator, p.attr_name, p.type_hint) for p in plugins]
 
 
 # libsct visitor
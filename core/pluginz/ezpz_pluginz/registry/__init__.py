@@ -1,7 +1,11 @@
+from typing import TYPE_CHECKING
+
 from ezpz_pluginz.registry.utils import find_plugin_in_path, is_package_installed, setup_local_registry
 from ezpz_pluginz.registry.config import REGISTRY_URL, LOCAL_REGISTRY_DIR, LOCAL_REGISTRY_FILE
 from ezpz_pluginz.registry.reg.local import LocalPluginRegistry
-from ezpz_pluginz.registry.reg.remote import PluginRegistryAPI
+
+if TYPE_CHECKING:
+  from ezpz_pluginz.registry.reg.remote import PluginRegistryAPI
 
 __all__ = [
   "LOCAL_REGISTRY_DIR",
@@ -13,3 +17,13 @@ __all__ = [
   "is_package_installed",
   "setup_local_registry",
 ]
+
+
+# the remote client pulls in httpx, so it is only imported once something asks for it
+def __getattr__(name: str) -> "type[PluginRegistryAPI]":
+  if name == "PluginRegistryAPI":
+    from ezpz_pluginz.registry.reg import remote  # noqa: PLC0415
+
+    return getattr(remote, name)
+  msg = f"module {__name__!r} has no attribute {name!r}"
+  raise AttributeError(msg)
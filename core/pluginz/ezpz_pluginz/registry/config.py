@@ -14,6 +14,8 @@ API_VERSION = "v1"
 REQUEST_TIMEOUT = 30.0
 
 # HTTP status codes
+HTTP_NO_CONTENT = 204
+HTTP_NOT_MODIFIED = 304
 HTTP_UNAUTHORIZED = 401
 HTTP_NOT_FOUND = 404
 HTTP_SERVER_ERROR = 500
@@ -21,6 +23,7 @@ HTTP_SERVER_ERROR = 500
 # Pagination
 DEFAULT_BATCH_SIZE = 100
 DEFAULT_PAGE_START = 1
+MAX_CONCURRENT_PAGES = 8
 
 # Default values
 DEFAULT_VERSION = "0.0.1"
@@ -29,6 +32,7 @@ DEFAULT_HOMEPAGE = "https://github.com/Summit-Sailors/EZPZ.git"
 # Local storage
 LOCAL_REGISTRY_DIR = Path.home() / ".ezpz" / "registry"
 LOCAL_REGISTRY_FILE = LOCAL_REGISTRY_DIR / "plugins.json"
+LOCAL_REGISTRY_TTL = 300.0  # seconds before the local registry is revalidated against the remote
 
 
 def load_ezpz_config() -> dict[str, Any]:
@@ -1,3 +1,6 @@
+from typing import ClassVar
+
+
 class PluginRegistryError(Exception):
   def __init__(self, message: str = "An error occurred in the plugin registry") -> None:
     super().__init__(message)
@@ -5,8 +8,10 @@ class PluginRegistryError(Exception):
 
 
 class PluginRegistryConnectionError(Exception):
+  CONNECTION_ERROR: ClassVar[str] = "Unable to connect to registry at {base_url}: {reason}"
+
   def __init__(self, base_url: str, reason: str = "connection failed") -> None:
-    super().__init__(f"Unable to connect to registry at {base_url}: {reason}")
+    super().__init__(self.CONNECTION_ERROR.format(base_url=base_url, reason=reason))
     self.base_url = base_url
     self.reason = reason
 
@@ -17,20 +22,26 @@ class PluginRegistryAuthError(Exception):
 
 
 class PluginNotFoundError(Exception):
+  NOT_FOUND_ERROR: ClassVar[str] = "Resource not found: {resource}"
+
   def __init__(self, resource: str) -> None:
-    super().__init__(f"Resource not found: {resource}")
+    super().__init__(self.NOT_FOUND_ERROR.format(resource=resource))
     self.resource = resource
 
 
 class PluginOperationError(Exception):
+  OPERATION_ERROR: ClassVar[str] = "Failed to {operation} plugin '{plugin_name}': {reason}"
+
   def __init__(self, operation: str, plugin_name: str, reason: str) -> None:
-    super().__init__(f"Failed to {operation} plugin '{plugin_name}': {reason}")
+    super().__init__(self.OPERATION_ERROR.format(operation=operation, plugin_name=plugin_name, reason=reason))
     self.operation = operation
     self.plugin_name = plugin_name
     self.reason = reason
 
 
 class PluginValidationError(Exception):
+  EMPTY_FIELD_ERROR: ClassVar[str] = "{field} cannot be empty"
+
   def __init__(self, field: str) -> None:
-    super().__init__(f"{field} cannot be empty")
+    super().__init__(self.EMPTY_FIELD_ERROR.format(field=field))
     self.field = field
@@ -1,13 +1,27 @@
 import re
-from typing import Any, ClassVar, Optional
+import hashlib
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, ClassVar, Optional
+from functools import cached_property
 
-from pydantic import Field, HttpUrl, EmailStr, BaseModel, field_validator
+from pydantic import Field, HttpUrl, BaseModel, ConfigDict, TypeAdapter, field_validator
+from pydantic.networks import validate_email
 
 from ezpz_pluginz.logger import setup_logger
 
+if TYPE_CHECKING:
+  from pydantic import ValidationInfo
+
 logger = setup_logger("Models")
 
 PACKAGE_NAME_REGEX = re.compile(r"^ezpz[_-][a-zA-Z0-9]([a-zA-Z0-9._-]*[a-zA-Z0-9])?$")
+# compiled once for the validators below; \Z, unlike $, does not accept a trailing newline
+PY_VERSION_REGEX = re.compile(r"^>=3\.\d{1,2}\Z")
+VERSION_REGEX = re.compile(r"^\d+\.\d+\.\d+\Z")
+
+# validation context for records the registry already validated on registration (registry pages, the local snapshot);
+# read-only, since a caller mutating a shared dict would switch email checking off or on for every validation
+TRUSTED_CONTEXT = MappingProxyType({"trusted": True})
 
 
 class PluginMetadataInner(BaseModel):
@@ -18,14 +32,21 @@ class PluginMetadataInner(BaseModel):
   python_version: str = Field(..., description="Minimum Python version (e.g., >=3.14)")
   dependencies: list[str] = Field(default_factory=list, description="List of required packages")
   documentation: HttpUrl = Field(..., description="URL to plugin documentation")
-  support_email: EmailStr = Field(..., description="Contact email for support")
+  support_email: str = Field(..., description="Contact email for support", json_schema_extra={"format": "email"})
 
   @field_validator("python_version")
   def validate_python_version(cls, v: str) -> str:
-    if not re.match(r"^>=3\.\d{1,2}$", v):
+    if not PY_VERSION_REGEX.match(v):
       raise ValueError(cls.PY_VERSION_ERROR)
     return v
 
+  @field_validator("support_email")
+  def validate_support_email(cls, v: str, info: "ValidationInfo") -> str:
+    # the email check runs in pure Python and dominates validating a registry page, trusted records skip it
+    if info.context and info.context.get("trusted"):
+      return v
+    return validate_email(v)[1]
+
 
 class PluginMetadata(BaseModel):
   VERSION_ERROR: ClassVar[str] = "Version must follow semantic versioning (e.g., '0.1.0')"
@@ -41,17 +62,37 @@ class PluginMetadata(BaseModel):
   homepage: HttpUrl = Field(..., description="URL to plugin homepage")
   metadata_: PluginMetadataInner = Field(..., description="Additional metadata")
 
+  # lowercase lookup keys, computed once per plugin instead of on every registry lookup
+  @cached_property
+  def name_lower(self) -> str:
+    return self.name.lower()
+
+  @cached_property
+  def package_name_lower(self) -> str:
+    return self.package_name.lower()
+
+  @cached_property
+  def aliases_lower(self) -> tuple[str, ...]:
+    return tuple(alias.lower() for alias in self.aliases)
+
+  # lowercase name/description/author/aliases joined by a unit separator, so a search is one substring test per plugin
+  @cached_property
+  def search_text(self) -> str:
+    return "\x1f".join((self.name_lower, self.description.lower(), (self.author or "").lower(), *self.aliases_lower))
+
   @field_validator("version")
   def validate_version(cls, v: str) -> str:
-    if not re.match(r"^\d+\.\d+\.\d+$", v):
+    if not VERSION_REGEX.match(v):
       raise ValueError(cls.VERSION_ERROR)
     return v
 
   @field_validator("name", "package_name", "description", "author", "category")
   def validate_non_empty(cls, v: str) -> str:
-    if not v.strip():
+    # stripped once and reused for both the emptiness check and the stored value
+    stripped = v.strip()
+    if not stripped:
       raise ValueError(cls.FIELD_ERROR)
-    return v.strip()
+    return stripped
 
 
 class PluginCreate(PluginMetadata):
@@ -59,6 +100,9 @@ class PluginCreate(PluginMetadata):
 
 
 class PluginResponse(PluginMetadata):
+  # registry records are read-only snapshots, freezing them keeps the cached lowercase fields from going stale
+  model_config = ConfigDict(frozen=True)
+
   id: str = Field(..., description="Unique identifier for the plugin")
   created_at: str = Field(..., description="Creation timestamp")
   updated_at: str = Field(..., description="Last update timestamp")
@@ -79,20 +123,55 @@ class PluginUpdate(BaseModel):
 
   @field_validator("version")
   def validate_version(cls, v: Optional[str]) -> Optional[str]:
-    if v and not re.match(r"^\d+\.\d+\.\d+$", v):
+    if v and not VERSION_REGEX.match(v):
       raise ValueError(PluginMetadata.VERSION_ERROR)
     return v
 
   @field_validator("name", "package_name", "description", "author", "category")
   def validate_non_empty(cls, v: Optional[str]) -> Optional[str]:
-    if v is not None and not v.strip():
+    if v is None:
+      return v
+    stripped = v.strip()
+    if not stripped:
       raise ValueError(PluginMetadata.FIELD_ERROR)
-    return v.strip() if v else v
+    return stripped
+
+
+class PluginPage(BaseModel):
+  plugins: list[PluginResponse] = Field(default_factory=list, description="Plugins on this page")
+  total_pages: int = Field(default=1, description="Number of pages available")
+
+
+class RegistrySnapshot(BaseModel):
+  timestamp: float = Field(default=0.0, description="When the snapshot was written")
+  etag: Optional[str] = Field(default=None, description="Remote registry ETag at the time of the snapshot")
+  digest: Optional[str] = Field(default=None, description="Digest of the plugins' serialized content")
+  plugins: list[PluginResponse] = Field(default_factory=list, description="Registered plugins")
+
+
+_PLUGIN_LIST_ADAPTER = TypeAdapter(list[PluginResponse])
+
+
+def plugins_digest(plugins: list[PluginResponse]) -> str:
+  return hashlib.blake2b(_PLUGIN_LIST_ADAPTER.dump_json(plugins)).hexdigest()
+
+
+# bound once, so deserializing a registry's worth of plugins skips the model_validate wrapper on every record
+_validate_plugin = PluginResponse.__pydantic_validator__.validate_python
+_validate_plugin_json = PluginResponse.__pydantic_validator__.validate_json
 
 
 def safe_deserialize_plugin(plugin_data: dict[str, Any]) -> Optional[PluginResponse]:
   try:
-    return PluginResponse.model_validate(plugin_data)
+    return _validate_plugin(plugin_data)
+  except Exception:
+    logger.exception("Failed to deserialize plugin data")
+    return None
+
+
+def safe_deserialize_plugin_json(content: bytes) -> Optional[PluginResponse]:
+  try:
+    return _validate_plugin_json(content)
   except Exception:
     logger.exception("Failed to deserialize plugin data")
     return None
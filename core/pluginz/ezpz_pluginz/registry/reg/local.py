@@ -1,63 +1,144 @@
-import json
+import os
+import sys
 import time
+import functools
+import threading
 import importlib.metadata
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Optional, cast
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from pydantic import ValidationError
 
 from ezpz_pluginz.logger import setup_logger
-from ezpz_pluginz.registry.config import LOCAL_REGISTRY_DIR, LOCAL_REGISTRY_FILE
-from ezpz_pluginz.registry.models import PluginMetadata, PluginResponse, safe_deserialize_plugin  # noqa: TC001
-from ezpz_pluginz.registry.reg.remote import PluginRegistryAPI
+from ezpz_pluginz.registry.config import LOCAL_REGISTRY_DIR, LOCAL_REGISTRY_TTL, LOCAL_REGISTRY_FILE
+from ezpz_pluginz.registry.models import (  # noqa: TC001
+  TRUSTED_CONTEXT,
+  PluginMetadata,
+  PluginResponse,
+  RegistrySnapshot,
+  plugins_digest,
+  safe_deserialize_plugin,
+)
+from ezpz_pluginz.registry.serialization import json_loads
+
+if TYPE_CHECKING:
+  from ezpz_pluginz.registry.reg.remote import PluginRegistryAPI
 
 logger = setup_logger("Registry")
 
+MAX_ENTRY_POINT_WORKERS = 8
+
 
 class LocalPluginRegistry:
   def __init__(self) -> None:
     self._plugins: dict[str, PluginResponse] = {}
-    self._api = PluginRegistryAPI()
+    # lowercase name -> plugin, one entry per plugin unlike _plugins which also holds every alias
+    self._canonical: dict[str, PluginResponse] = {}
+    # lowercase package name -> plugin; names and aliases are already the keys of _plugins
+    self._by_package: dict[str, PluginResponse] = {}
+    # freshness of the loaded registry: when it was last saved and the remote's ETag at the time
+    self._timestamp = 0.0
+    self._etag: str | None = None
+    # digest of the stored plugins, so a refresh that brings identical content skips the rebuild and the rewrite
+    self._digest: str | None = None
+    # created on first use, reads served from the cached registry never build an HTTP client
+    self._api: "PluginRegistryAPI | None" = None
+    # the stored registry is parsed on the first query, commands that only talk to the remote never read it
+    self._loaded = False
     self._ensure_registry_dir()
-    self._load_local_registry()
+
+  def __del__(self) -> None:
+    if getattr(self, "_api", None) is not None:
+      self.close()
+
+  @property
+  def api(self) -> "PluginRegistryAPI":
+    # the pooled client used to sync this registry, shared so callers talking to the remote reuse its connections
+    if self._api is None:
+      # imported here so commands served from the local cache never load httpx
+      from ezpz_pluginz.registry.reg.remote import PluginRegistryAPI  # noqa: PLC0415
+
+      self._api = PluginRegistryAPI()
+    return self._api
+
+  def close(self) -> None:
+    if self._api is not None:
+      self._api.close()
+      self._api = None
 
   def _ensure_registry_dir(self) -> None:
     LOCAL_REGISTRY_DIR.mkdir(parents=True, exist_ok=True)
 
+  def _ensure_loaded(self) -> None:
+    if not self._loaded:
+      self._loaded = True
+      self._load_local_registry()
+
   def _load_local_registry(self) -> None:
     if not LOCAL_REGISTRY_FILE.exists():
       return
 
     try:
-      with LOCAL_REGISTRY_FILE.open("r") as f:
-        data = json.load(f)
-        for plugin_data in data.get("plugins", []):
-          plugin = safe_deserialize_plugin(plugin_data)
-          if plugin:
-            self._register_plugin(plugin)
-      logger.debug(f"Loaded {len(data.get('plugins', []))} plugins from local registry")
-    except Exception:
-      logger.warning("Failed to load local registry")
+      snapshot = _parse_snapshot(LOCAL_REGISTRY_FILE.read_bytes())
+      # unchanged refreshes only touch the file, so its mtime can be newer than the stored timestamp
+      self._timestamp = max(snapshot.timestamp, LOCAL_REGISTRY_FILE.stat().st_mtime)
+      self._etag = snapshot.etag
+      self._digest = snapshot.digest
+      self._replace_plugins(snapshot.plugins)
+      logger.debug("Loaded %s plugins from local registry", len(snapshot.plugins))
+    # unreadable file or content that is not a registry; anything else is a bug
+    except (OSError, ValueError) as e:
+      logger.warning("Failed to load local registry: %s", e)
 
   def _save_local_registry(self, plugins: list[PluginResponse]) -> None:
     try:
-      registry_data = {"timestamp": time.time(), "plugins": [plugin.model_dump() for plugin in plugins]}
-      with LOCAL_REGISTRY_FILE.open("w") as f:
-        json.dump(registry_data, f, indent=2)
-      logger.debug(f"Saved {len(plugins)} plugins to local registry")
+      self._timestamp = time.time()
+      snapshot = RegistrySnapshot(timestamp=self._timestamp, etag=self._etag, digest=self._digest, plugins=plugins)
+      # write to a sibling temp file and swap it in, so a crash mid-write never leaves a torn registry
+      tmp_file = LOCAL_REGISTRY_FILE.with_suffix(".json.tmp")
+      # plain compact JSON, other tools (e.g. the plugin CI scripts) read this file with json.load;
+      # pydantic serializes the plugins straight to JSON bytes, no intermediate dict per plugin is built
+      tmp_file.write_bytes(snapshot.model_dump_json().encode())
+      tmp_file.replace(LOCAL_REGISTRY_FILE)
+      logger.debug("Saved %s plugins to local registry", len(plugins))
     except Exception:
       logger.warning("Failed to save local registry")
 
-  def _register_plugin(self, plugin: PluginResponse) -> None:
-    self._plugins[plugin.name.lower()] = plugin
-    for alias in plugin.aliases:
-      self._plugins[alias.lower()] = plugin
-
-  def fetch_and_update_registry(self) -> bool:
+  def _touch_local_registry(self) -> None:
+    try:
+      self._timestamp = time.time()
+      os.utime(LOCAL_REGISTRY_FILE, (self._timestamp, self._timestamp))
+    except OSError:
+      logger.warning("Failed to update local registry timestamp")
+
+  def _replace_plugins(self, plugins: list[PluginResponse]) -> None:
+    # the new indexes are built aside and swapped in, so a reader on another thread never sees a half-filled registry
+    lookup = {alias_lower: plugin for plugin in plugins for alias_lower in plugin.aliases_lower}
+    # names are applied after aliases so a name always wins a key collision
+    lookup.update({plugin.name_lower: plugin for plugin in plugins})
+    self._canonical = {plugin.name_lower: plugin for plugin in plugins}
+    self._by_package = {plugin.package_name_lower: plugin for plugin in plugins}
+    self._plugins = lookup
+
+  def fetch_and_update_registry(self, *, force: bool = False) -> bool:
+    self._ensure_loaded()
+    if not force and self._canonical and time.time() - self._timestamp < LOCAL_REGISTRY_TTL:
+      logger.debug("Local registry is fresh, skipping remote fetch")
+      return True
     logger.debug("Fetching plugins from remote registry...")
     try:
-      remote_plugins = self._api.fetch_plugins()
-      if remote_plugins:
-        self._plugins.clear()
-        for plugin in remote_plugins:
-          self._register_plugin(plugin)
+      # a forced refresh must refetch every page, so it never revalidates against the stored ETag
+      remote_plugins, etag = self.api.fetch_plugins_if_modified(self._etag if self._canonical and not force else None)
+      if remote_plugins is None:
+        self._touch_local_registry()
+      elif remote_plugins:
+        digest = plugins_digest(remote_plugins)
+        if digest == self._digest and etag == self._etag:
+          logger.debug("Remote registry content is unchanged")
+          self._touch_local_registry()
+          return True
+        self._etag, self._digest = etag, digest
+        self._replace_plugins(remote_plugins)
         self._save_local_registry(remote_plugins)
         logger.info(f"Updated local registry with {len(remote_plugins)} plugins")
     except Exception:
@@ -65,91 +146,100 @@ class LocalPluginRegistry:
       return False
     return True
 
+  def refresh_in_background(self, *, force: bool = False) -> "Future[bool]":
+    # stale-while-revalidate: queries keep answering from the cached registry until the refresh swaps in the new one
+    self._ensure_loaded()
+    future: Future[bool] = Future()
+
+    def run() -> None:
+      if not future.set_running_or_notify_cancel():
+        return
+      try:
+        future.set_result(self.fetch_and_update_registry(force=force))
+      except Exception as e:
+        future.set_exception(e)
+
+    # a daemon thread, unlike an executor worker, is not joined at exit, so a caller that bails out early never waits
+    # on the remote; the registry file is swapped in atomically, an interrupted refresh cannot tear it
+    threading.Thread(target=run, name="ezpz-registry-refresh", daemon=True).start()
+    return future
+
   def get_plugin(self, name: str) -> Optional[PluginResponse]:
+    self._ensure_loaded()
     return self._plugins.get(name.lower())
 
   def list_plugins(self) -> list[PluginResponse]:
-    seen: set[str] = set()
-    unique_plugins: list[PluginResponse] = []
-
-    for plugin in self._plugins.values():
-      if plugin.name not in seen:
-        unique_plugins.append(plugin)
-        seen.add(plugin.name)
-    return unique_plugins
+    self._ensure_loaded()
+    return list(self._canonical.values())
 
   def is_plugin_registered(self, plugin_name: str) -> bool:
-    try:
-      plugin_name_lower = plugin_name.lower()
-      if plugin_name_lower in self._plugins:
-        return True
-      for plugin in self.list_plugins():
-        if (
-          plugin.name.lower() == plugin_name_lower
-          or plugin.package_name.lower() == plugin_name_lower
-          or plugin_name_lower in [alias.lower() for alias in plugin.aliases]
-        ):
-          return True
-    except Exception:
-      logger.warning(f"Error checking plugin registration for '{plugin_name}'")
-      return False
-    return False
+    self._ensure_loaded()
+    key = plugin_name.lower()
+    return key in self._plugins or key in self._by_package
 
   def search_plugins(self, keyword: str) -> list[PluginResponse]:
+    self._ensure_loaded()
     keyword_lower = keyword.lower()
-    matching_plugins: list[PluginResponse] = []
-    seen: set[str] = set()
-
-    for plugin in self._plugins.values():
-      if plugin.name in seen:
-        continue
-      search_fields = [
-        plugin.name.lower(),
-        plugin.description.lower(),
-        plugin.author.lower() if plugin.author else "",
-        *[alias.lower() for alias in plugin.aliases],
-      ]
-      if any(keyword_lower in field for field in search_fields):
-        matching_plugins.append(plugin)
-        seen.add(plugin.name)
-    return matching_plugins
+    return [plugin for plugin in self._canonical.values() if keyword_lower in plugin.search_text]
 
   def remove_plugin_from_local_registry(self, plugin: PluginResponse) -> None:
+    self._ensure_loaded()
     try:
-      plugin_name_lower = plugin.name.lower()
-      if plugin_name_lower in self._plugins:
-        del self._plugins[plugin_name_lower]
-      for alias in plugin.aliases:
-        alias_lower = alias.lower()
-        if alias_lower in self._plugins:
-          del self._plugins[alias_lower]
+      self._plugins.pop(plugin.name_lower, None)
+      self._canonical.pop(plugin.name_lower, None)
+      self._by_package.pop(plugin.package_name_lower, None)
+      for alias_lower in plugin.aliases_lower:
+        self._plugins.pop(alias_lower, None)
+      # the local copy no longer mirrors the remote content it was fetched as
+      self._digest = None
       remaining_plugins = self.list_plugins()
       self._save_local_registry(remaining_plugins)
-      logger.debug(f"Removed plugin {plugin.name} from local registry")
+      logger.debug("Removed plugin %s from local registry", plugin.name)
     except Exception as e:
       logger.warning(f"Failed to remove plugin from local registry: {e}")
-      self.fetch_and_update_registry()
+      self.fetch_and_update_registry(force=True)
 
 
-def discover_local_plugins() -> list[PluginResponse]:
-  plugins: list[PluginResponse] = []
+def _parse_snapshot(raw: bytes) -> RegistrySnapshot:
+  try:
+    # validates straight from the file bytes, the registry is never held as a dict tree next to its models
+    return RegistrySnapshot.model_validate_json(raw, context=TRUSTED_CONTEXT)
+  except ValidationError:
+    # a single malformed plugin must not drop the whole registry, validate plugin by plugin instead
+    data = json_loads(raw)
+    # JSON that is not a registry object at all stays a ValidationError, the caller's handler covers it
+    if not isinstance(data, dict) or not isinstance(data.get("plugins", []), list):
+      raise
+    snapshot_data = cast("dict[str, Any]", data)
+    plugins = [plugin for plugin_data in snapshot_data.get("plugins", []) if (plugin := safe_deserialize_plugin(plugin_data))]
+    return RegistrySnapshot(timestamp=snapshot_data.get("timestamp", 0.0), etag=snapshot_data.get("etag"), plugins=plugins)
+
+
+# entry points only change when sys.path does, so one scan of the installed distributions per path layout is enough
+@functools.lru_cache(maxsize=1)
+def _ezpz_entry_points(_sys_path: tuple[str, ...]) -> tuple[importlib.metadata.EntryPoint, ...]:
+  return tuple(importlib.metadata.entry_points(group="ezpz.plugins"))
+
+
+def _load_entry_point_plugin(entry_point: importlib.metadata.EntryPoint) -> Optional[PluginResponse]:
   try:
-    for dist in importlib.metadata.distributions():
-      entry_points = dist.entry_points
-      ezpz_plugins = entry_points.select(group="ezpz.plugins") if hasattr(entry_points, "select") else [ep for ep in entry_points if ep.group == "ezpz.plugins"]
-      for entry_point in ezpz_plugins:
-        try:
-          plugin_info_func = entry_point.load()
-          plugin_info: PluginMetadata = plugin_info_func()
-          plugin_response = PluginResponse(
-            id="",  # ID will be assigned by registry
-            created_at="",
-            updated_at="",
-            **plugin_info.model_dump(),
-          )
-          plugins.append(plugin_response)
-        except Exception:
-          logger.warning(f"Failed to load plugin from {entry_point.name}")
-  except ImportError:
-    logger.debug("importlib.metadata not available")
-  return plugins
+    plugin_info_func = entry_point.load()
+    plugin_info: PluginMetadata = plugin_info_func()
+    return PluginResponse(
+      id="",  # ID will be assigned by registry
+      created_at="",
+      updated_at="",
+      **plugin_info.model_dump(),
+    )
+  except Exception:
+    logger.warning(f"Failed to load plugin from {entry_point.name}")
+    return None
+
+
+def discover_local_plugins() -> list[PluginResponse]:
+  entry_points = _ezpz_entry_points(tuple(sys.path))
+  if not entry_points:
+    return []
+  # loading an entry point imports its module, which is mostly disk reads that overlap across threads
+  with ThreadPoolExecutor(max_workers=min(MAX_ENTRY_POINT_WORKERS, len(entry_points))) as executor:
+    return [plugin for plugin in executor.map(_load_entry_point_plugin, entry_points) if plugin is not None]
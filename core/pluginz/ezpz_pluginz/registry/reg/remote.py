@@ -1,20 +1,33 @@
-import json
-from typing import Any, ClassVar, Optional
+from typing import TYPE_CHECKING, Any, Self, ClassVar, NoReturn, Optional, cast
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 
 import httpx
+from pydantic import ValidationError
 
 from ezpz_pluginz.logger import setup_logger
 from ezpz_pluginz.registry.config import (
   API_VERSION,
   REGISTRY_URL,
   HTTP_NOT_FOUND,
+  HTTP_NO_CONTENT,
   REQUEST_TIMEOUT,
+  HTTP_NOT_MODIFIED,
   HTTP_SERVER_ERROR,
   HTTP_UNAUTHORIZED,
   DEFAULT_BATCH_SIZE,
   DEFAULT_PAGE_START,
+  MAX_CONCURRENT_PAGES,
+)
+from ezpz_pluginz.registry.models import (  # noqa: TC001
+  TRUSTED_CONTEXT,
+  PluginPage,
+  PluginCreate,
+  PluginUpdate,
+  PluginResponse,
+  safe_deserialize_plugin,
+  safe_deserialize_plugin_json,
 )
-from ezpz_pluginz.registry.models import PluginCreate, PluginUpdate, PluginResponse, safe_deserialize_plugin  # noqa: TC001
 from ezpz_pluginz.registry.exceptions import (
   PluginNotFoundError,
   PluginRegistryError,
@@ -22,23 +35,159 @@ from ezpz_pluginz.registry.exceptions import (
   PluginRegistryAuthError,
   PluginRegistryConnectionError,
 )
+from ezpz_pluginz.registry.serialization import json_loads
+
+if TYPE_CHECKING:
+  from types import TracebackType
 
 logger = setup_logger("Registry")
 
 
+REQUEST_ERRORS = (httpx.ConnectError, httpx.TimeoutException, httpx.HTTPStatusError, ValueError)
+
+API_PREFIX = f"/api/{API_VERSION}"
+SUPPORTED_METHODS = frozenset({"GET", "POST"})
+MIN_JSON_BODY = 8
+INVALID_PAGE_ERROR = "Registry returned a malformed plugin page"
+
+
+def _deserialize_plugins(plugins_data: list[dict[str, Any]]) -> list[PluginResponse]:
+  plugins: list[PluginResponse] = []
+  for plugin_data in plugins_data:
+    plugin = safe_deserialize_plugin(plugin_data)
+    if plugin:
+      plugins.append(plugin)
+  return plugins
+
+
+# only a short body can be whitespace-only, so a real payload is never copied by strip() just to test for emptiness
+def _is_blank(content: bytes) -> bool:
+  return not content or (len(content) < MIN_JSON_BODY and not content.strip())
+
+
+def _parse_plugin_page(content: bytes) -> tuple[list[PluginResponse], int]:
+  if _is_blank(content):
+    return [], DEFAULT_PAGE_START
+  try:
+    # validates straight from the response bytes, without building an intermediate dict per plugin
+    page = PluginPage.model_validate_json(content, context=TRUSTED_CONTEXT)
+  except ValidationError:
+    # a single malformed plugin must not drop the whole page, validate plugin by plugin instead
+    data = json_loads(content)
+    # a body that is not a page at all is reported like any other bad response (ValueError is in REQUEST_ERRORS)
+    if not isinstance(data, dict) or not isinstance(data.get("plugins", []), list) or not isinstance(data.get("total_pages", DEFAULT_PAGE_START), int):
+      raise ValueError(INVALID_PAGE_ERROR) from None  # noqa: TRY004
+    page_data = cast("dict[str, Any]", data)
+    return _deserialize_plugins(page_data.get("plugins", [])), page_data.get("total_pages", DEFAULT_PAGE_START)
+  return page.plugins, page.total_pages
+
+
+def _registration_error_message(plugin_name: str, error: BaseException) -> str:
+  return (
+    f"Failed to register plugin '{plugin_name}'.\n"
+    f"Possible reasons:\n"
+    f"1. Plugin name already exists (even if marked as deleted - wait for hard deletion),\n"
+    f"2. Network/server error,\n "
+    f"3. Invalid plugin data or authorization.\n "
+    "\n"
+    f"Error details: {error!s}\n"
+  )
+
+
+def _raise_registration_error(error_msg: str, plugin_name: str) -> NoReturn:
+  raise PluginOperationError("register", plugin_name, error_msg)
+
+
 class PluginRegistryAPI:
   UNSUPPORTED_HTTP_METHOD_ERROR: ClassVar[str] = "Unsupported HTTP method: {method}"
   EMPTY_SEARCH_KEYWORD_ERROR: ClassVar[str] = "Search keyword cannot be empty"
   EMPTY_PLUGIN_ID_ERROR: ClassVar[str] = "Plugin ID cannot be empty"
   GITHUB_TOKEN_REQUIRED_ERROR: ClassVar[str] = "Authentication is required"  # noqa: S105
 
-  def __init__(self, base_url: str = REGISTRY_URL) -> None:
+  def __init__(self, base_url: str = REGISTRY_URL, transport: httpx.BaseTransport | None = None) -> None:
     self.base_url = base_url.rstrip("/")
     self.timeout = REQUEST_TIMEOUT
+    # one pooled client per API instance so sockets (and TLS sessions) are reused across calls
+    self._client = httpx.Client(
+      base_url=self.base_url,
+      timeout=self.timeout,
+      headers={"Accept": "application/json"},
+      http2=True,
+      limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+      transport=transport,
+    )
 
-  def invalid_method(self, method: str) -> None:
+  def invalid_method(self, method: str) -> NoReturn:
     raise ValueError(self.UNSUPPORTED_HTTP_METHOD_ERROR.format(method=method))
 
+  def _build_request(
+    self,
+    endpoint: str,
+    method: str,
+    data: dict[str, Any] | None,
+    headers: dict[str, str] | None,
+    params: dict[str, Any] | None,
+    *,
+    use_json: bool,
+  ) -> tuple[str, dict[str, Any]]:
+    if method not in SUPPORTED_METHODS:
+      self.invalid_method(method)
+    url = API_PREFIX + endpoint
+    if method == "GET":
+      return url, {"params": params, "headers": headers}
+    # httpx sets the matching Content-Type for json= and data= bodies itself
+    return url, {"json" if use_json else "data": data or {}, "headers": headers}
+
+  def _checked_content(self, response: httpx.Response, endpoint: str) -> bytes:
+    if response.status_code == HTTP_UNAUTHORIZED:
+      raise PluginRegistryAuthError()
+    if response.status_code == HTTP_NOT_FOUND:
+      raise PluginNotFoundError(endpoint)
+    if response.status_code >= HTTP_SERVER_ERROR:
+      raise PluginRegistryError("Server_error")
+    response.raise_for_status()
+    # nothing to decode in a 204 or in a non-JSON body (e.g. an HTML page served with 200 by a proxy)
+    if response.status_code == HTTP_NO_CONTENT:
+      return b""
+    content_type = response.headers.get("content-type")
+    if content_type is not None and "json" not in content_type:
+      logger.debug("Ignoring non-JSON response from %s (%s)", response.url, content_type)
+      return b""
+    return response.content
+
+  def _parse_response(self, response: httpx.Response, endpoint: str) -> dict[str, Any]:
+    content = self._checked_content(response, endpoint)
+    if _is_blank(content):
+      logger.debug("Empty response from %s", response.url)
+      return {}
+    return json_loads(content)
+
+  def _translate_error(self, exc: Exception) -> Exception:
+    if isinstance(exc, httpx.ConnectError):
+      return PluginRegistryConnectionError(self.base_url, "connection refused")
+    if isinstance(exc, httpx.TimeoutException):
+      return PluginRegistryConnectionError(self.base_url, f"timeout after {self.timeout}s")
+    if isinstance(exc, httpx.HTTPStatusError):
+      return PluginRegistryError(f"{exc.response.text}")
+    return PluginRegistryError(f"{exc}")
+
+  @staticmethod
+  def _page_data(page: int, *, verified_only: bool) -> dict[str, str]:
+    return {
+      "page": str(page),
+      "page_size": str(DEFAULT_BATCH_SIZE),
+      "verified_only": str(verified_only).lower(),
+    }
+
+  def close(self) -> None:
+    self._client.close()
+
+  def __enter__(self) -> Self:
+    return self
+
+  def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: "TracebackType | None") -> None:
+    self.close()
+
   def _make_request(
     self,
     endpoint: str,
@@ -49,96 +198,94 @@ class PluginRegistryAPI:
     *,
     use_json: bool = False,
   ) -> dict[str, Any]:
-    url = f"{self.base_url}/api/{API_VERSION}{endpoint}"
-    response = None
-    headers = headers or {}
-    request_data = data or {}
+    try:
+      return self._parse_response(self._send(endpoint, method, data, headers, params, use_json=use_json), endpoint)
+    except REQUEST_ERRORS as exc:
+      raise self._translate_error(exc) from exc
 
+  def _request_content(
+    self,
+    endpoint: str,
+    method: str = "POST",
+    data: dict[str, Any] | None = None,
+    headers: dict[str, str] | None = None,
+    *,
+    use_json: bool = False,
+  ) -> bytes:
     try:
-      with httpx.Client(timeout=self.timeout) as client:
-        if method == "POST":
-          if use_json:
-            headers["Content-Type"] = "application/json"
-            response = client.post(url, json=request_data, headers=headers)
-          else:
-            headers["Content-Type"] = "application/x-www-form-urlencoded"
-            response = client.post(url, data=request_data, headers=headers)
-        elif method == "GET":
-          response = client.get(url, params=params, headers=headers)
-        else:
-          self.invalid_method(method)
-
-        if response is not None:
-          if response.status_code == HTTP_UNAUTHORIZED:
-            raise PluginRegistryAuthError()
-          if response.status_code == HTTP_NOT_FOUND:
-            raise PluginNotFoundError(endpoint)
-          if response.status_code >= HTTP_SERVER_ERROR:
-            raise PluginRegistryError("Server_error")
-          response.raise_for_status()
-          if not response.content.strip():
-            logger.debug(f"Empty response from {url}")
-            return {}
-        return response.json() if response is not None else {}
-
-    except httpx.ConnectError as exc:
-      raise PluginRegistryConnectionError(self.base_url, "connection refused") from exc
-    except httpx.TimeoutException as exc:
-      raise PluginRegistryConnectionError(self.base_url, f"timeout after {self.timeout}s") from exc
-    except httpx.HTTPStatusError as exc:
-      if exc.response.status_code not in [HTTP_UNAUTHORIZED, HTTP_NOT_FOUND]:
-        raise PluginRegistryError(f"{exc.response.text}") from exc
-      raise
-    except (ValueError, json.JSONDecodeError) as exc:
-      raise PluginRegistryError(f"{exc}") from exc
+      return self._checked_content(self._send(endpoint, method, data, headers, use_json=use_json), endpoint)
+    except REQUEST_ERRORS as exc:
+      raise self._translate_error(exc) from exc
+
+  def _send(
+    self,
+    endpoint: str,
+    method: str = "POST",
+    data: dict[str, Any] | None = None,
+    headers: dict[str, str] | None = None,
+    params: dict[str, Any] | None = None,
+    *,
+    use_json: bool = False,
+  ) -> httpx.Response:
+    url, request_kwargs = self._build_request(endpoint, method, data, headers, params, use_json=use_json)
+    return self._client.request(method, url, **request_kwargs)
 
   def check_health(self) -> dict[str, Any]:
     logger.info("Checking registry health")
     return self._make_request("/health", method="POST")
 
   def fetch_plugins(self, *, verified_only: bool = False) -> list[PluginResponse]:
-    all_plugins: list[PluginResponse] = []
-    batch_size = DEFAULT_BATCH_SIZE
-    page = DEFAULT_PAGE_START
-
     logger.info(f"Fetching plugins from registry (verified_only={verified_only})")
-
-    while True:
-      data = {
-        "page": str(page),
-        "page_size": str(batch_size),
-        "verified_only": str(verified_only).lower(),
-      }
-      response = self._make_request("/plugins", data=data)
-      plugins_data: list[dict[str, Any]] = response.get("plugins", [])
-      if not plugins_data:
-        break
-      batch_plugins: list[PluginResponse] = []
-      for plugin_data in plugins_data:
-        plugin = safe_deserialize_plugin(plugin_data)
-        if plugin:
-          batch_plugins.append(plugin)
-      all_plugins.extend(batch_plugins)
-      logger.debug(f"Fetched page {page}: {len(batch_plugins)} plugins")
-      total_pages = response.get("total_pages", DEFAULT_PAGE_START)
-      if page >= total_pages:
-        break
-      page += 1
+    try:
+      all_plugins, _ = self._collect_pages(self._request_page(DEFAULT_PAGE_START, verified_only=verified_only), verified_only=verified_only)
+    except REQUEST_ERRORS as exc:
+      raise self._translate_error(exc) from exc
     logger.info(f"Successfully fetched {len(all_plugins)} plugins")
     return all_plugins
 
+  def fetch_plugins_if_modified(self, etag: str | None, *, verified_only: bool = False) -> tuple[list[PluginResponse] | None, str | None]:
+    # revalidates the first page against `etag`, a None plugin list means the registry is unchanged;
+    # the ETag only covers that page, so it is only returned (and can only come back) for a single-page registry
+    logger.info(f"Fetching plugins from registry (verified_only={verified_only})")
+    headers = {"If-None-Match": etag} if etag else None
+    try:
+      response = self._request_page(DEFAULT_PAGE_START, verified_only=verified_only, headers=headers)
+      if response.status_code == HTTP_NOT_MODIFIED:
+        logger.info("Registry has not changed since the last fetch")
+        return None, etag
+      all_plugins, total_pages = self._collect_pages(response, verified_only=verified_only)
+    except REQUEST_ERRORS as exc:
+      raise self._translate_error(exc) from exc
+    logger.info(f"Successfully fetched {len(all_plugins)} plugins")
+    return all_plugins, response.headers.get("etag") if total_pages <= DEFAULT_PAGE_START else None
+
+  def _request_page(self, page: int, *, verified_only: bool, headers: dict[str, str] | None = None) -> httpx.Response:
+    return self._send("/plugins", data=self._page_data(page, verified_only=verified_only), headers=headers)
+
+  def _fetch_page(self, page: int, *, verified_only: bool) -> tuple[list[PluginResponse], int]:
+    return _parse_plugin_page(self._checked_content(self._request_page(page, verified_only=verified_only), "/plugins"))
+
+  def _collect_pages(self, response: httpx.Response, *, verified_only: bool) -> tuple[list[PluginResponse], int]:
+    all_plugins, total_pages = _parse_plugin_page(self._checked_content(response, "/plugins"))
+    logger.debug("Fetched page %s: %s plugins", DEFAULT_PAGE_START, len(all_plugins))
+    if not all_plugins or total_pages <= DEFAULT_PAGE_START:
+      return all_plugins, total_pages
+    # the first page reports the page count, the remaining pages are requested concurrently over the pooled client
+    remaining_pages = range(DEFAULT_PAGE_START + 1, total_pages + 1)
+    with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_PAGES, len(remaining_pages))) as executor:
+      for batch_plugins, _ in executor.map(partial(self._fetch_page, verified_only=verified_only), remaining_pages):
+        all_plugins.extend(batch_plugins)
+    return all_plugins, total_pages
+
   def search_plugins(self, keyword: str) -> list[PluginResponse]:
     if not keyword.strip():
       raise ValueError(self.EMPTY_SEARCH_KEYWORD_ERROR)
     logger.info(f"Searching plugins for keyword: '{keyword}'")
-    data = {"query_text": keyword}
-    response = self._make_request("/plugins/search", data=data)
-    plugins_data: list[dict[str, Any]] = response.get("plugins", [])
-    plugins: list[PluginResponse] = []
-    for plugin_data in plugins_data:
-      plugin = safe_deserialize_plugin(plugin_data)
-      if plugin:
-        plugins.append(plugin)
+    content = self._request_content("/plugins/search", data={"query_text": keyword})
+    try:
+      plugins, _ = _parse_plugin_page(content)
+    except ValueError as exc:
+      raise PluginRegistryError(f"{exc}") from exc
     logger.info(f"Search returned {len(plugins)} plugins")
     return plugins
 
@@ -146,10 +293,10 @@ class PluginRegistryAPI:
     if not plugin_id.strip():
       raise ValueError(self.EMPTY_PLUGIN_ID_ERROR)
     logger.info(f"Fetching plugin: {plugin_id}")
-    response = self._make_request(f"/plugins/get/{plugin_id}")
-    if not response:
+    content = self._request_content(f"/plugins/get/{plugin_id}")
+    if _is_blank(content):
       raise PluginNotFoundError(plugin_id)
-    plugin = safe_deserialize_plugin(response)
+    plugin = safe_deserialize_plugin_json(content)
     if not plugin:
       raise PluginRegistryError("Invalid_plugin_data")
     logger.info(f"Successfully retrieved plugin: {plugin.name}")
@@ -159,29 +306,18 @@ class PluginRegistryAPI:
     if not auth_secret.strip():
       raise ValueError(self.GITHUB_TOKEN_REQUIRED_ERROR)
     logger.info(f"Registering plugin: {plugin_info.name}")
-    data = {"request": {"plugin_data": plugin_info.model_dump()}}
+    data = {"request": {"plugin_data": plugin_info.model_dump(mode="json")}}
     headers = {"Authorization": f"Bearer {auth_secret}"}
 
-    def _handle_registration_error(error_msg: str, plugin_name: str) -> None:
-      raise PluginOperationError("register", plugin_name, error_msg)
-
     try:
       response = self._make_request("/plugins/register", data=data, headers=headers, use_json=True)
       plugin = safe_deserialize_plugin(response)
       if not plugin:
         error_msg = response.get("error", "Unknown registration error")
-        _handle_registration_error(error_msg, plugin_info.name)
+        _raise_registration_error(error_msg, plugin_info.name)
       logger.info("Successfully registered plugin")
     except Exception as e:
-      error_message = (
-        f"Failed to register plugin '{plugin_info.name}'.\n"
-        f"Possible reasons:\n"
-        f"1. Plugin name already exists (even if marked as deleted - wait for hard deletion),\n"
-        f"2. Network/server error,\n "
-        f"3. Invalid plugin data or authorization.\n "
-        "\n"
-        f"Error details: {e!s}\n"
-      )
+      error_message = _registration_error_message(plugin_info.name, e)
       logger.exception(error_message)
       return None
     return plugin
@@ -192,8 +328,8 @@ class PluginRegistryAPI:
     if not auth_secret.strip():
       raise ValueError(self.GITHUB_TOKEN_REQUIRED_ERROR)
     logger.info(f"Updating plugin: {plugin_id}")
-    plugin_dict = {k: v for k, v in plugin_info.model_dump().items() if v is not None}
-    data = {"request": {"plugin_data": plugin_dict}}
+    # only the fields being changed are sent; dumped in JSON mode so URLs arrive as strings
+    data = {"request": {"plugin_data": plugin_info.model_dump(mode="json", exclude_none=True)}}
     headers = {"Authorization": f"Bearer {auth_secret}"}
     response = self._make_request(f"/plugins/update/{plugin_id}", data=data, headers=headers, use_json=True)
     plugin = safe_deserialize_plugin(response)
@@ -0,0 +1,14 @@
+import json
+from typing import Any
+
+try:
+  import orjson
+except ImportError:  # orjson is an optional speedup, the stdlib codec is always available
+  orjson = None
+
+
+# untrusted bytes can hold any JSON value, callers check the shape before using it
+def json_loads(data: bytes) -> Any:  # noqa: ANN401
+  if orjson is not None:
+    return orjson.loads(data)
+  return json.loads(data)
@@ -1,7 +1,14 @@
+import os
+import re
+import sys
+import hashlib
+import functools
 import importlib.util
 import importlib.metadata
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Iterator, Optional
 from pathlib import Path
+from itertools import islice
+from collections import deque
 
 from ezpz_pluginz.logger import setup_logger
 from ezpz_pluginz.registry.reg.local import LocalPluginRegistry
@@ -11,13 +18,30 @@ if TYPE_CHECKING:
 
 logger = setup_logger("Utils")
 
+# upper bound on __init__.py files tried by the recursive fallback in _load_plugin_from_path
+MAX_RECURSIVE_ENTRY_POINTS = 50
+# how many directory levels below the plugin root the recursive fallback descends
+MAX_RECURSIVE_DEPTH = 4
+# runs of separators that distribution name normalization folds together
+DIST_NAME_SEPARATORS = re.compile(r"[-_.]+")
+# directories that never hold plugin sources, not descended into by the recursive fallback
+PRUNED_DIRS = frozenset(
+  {".git", ".venv", "venv", "__pycache__", "node_modules", "target", "dist", "build", "site-packages", ".tox", ".mypy_cache", ".pytest_cache", ".ruff_cache"},
+)
+
+
+def _normalize_dist_name(name: str) -> str:
+  return DIST_NAME_SEPARATORS.sub("_", name).lower()
+
+
+# installed distributions only change when sys.path does, so listings that check every plugin scan site-packages once
+@functools.lru_cache(maxsize=1)
+def _installed_distributions(_sys_path: tuple[str, ...]) -> frozenset[str]:
+  return frozenset(_normalize_dist_name(name) for dist in importlib.metadata.distributions() if (name := dist.metadata["Name"]))
+
 
 def is_package_installed(package_name: str) -> bool:
-  try:
-    importlib.metadata.distribution(package_name)
-  except importlib.metadata.PackageNotFoundError:
-    return False
-  return True
+  return _normalize_dist_name(package_name) in _installed_distributions(tuple(sys.path))
 
 
 def setup_local_registry() -> None:
@@ -39,37 +63,35 @@ def find_plugin_in_path(plugin_path: str, include_paths: list[str]) -> Optional[
   for include_path in include_paths:
     search_path = Path(include_path)
     full_path = search_path / plugin_path
+    # a direct probe; a subdirectory named plugin_path is exactly this path, no listing of the include path is needed
     if full_path.exists():
       plugin_info = _load_plugin_from_path(full_path)
       if plugin_info:
         return plugin_info
-    if search_path.exists():
-      for subdir in search_path.iterdir():
-        if subdir.is_dir() and subdir.name == plugin_path:
-          plugin_info = _load_plugin_from_path(subdir)
-          if plugin_info:
-            return plugin_info
   return None
 
 
 def _load_plugin_from_path(plugin_path: Path) -> Optional["PluginMetadata"]:
   try:
+    package_name = _extract_package_name(plugin_path.name)
     entry_point_patterns = [
-      plugin_path / "python" / _extract_package_name(plugin_path.name) / "__init__.py",
-      plugin_path / "src" / _extract_package_name(plugin_path.name) / "__init__.py",
-      plugin_path / _extract_package_name(plugin_path.name) / "__init__.py",
+      plugin_path / "python" / package_name / "__init__.py",
+      plugin_path / "src" / package_name / "__init__.py",
+      plugin_path / package_name / "__init__.py",
       plugin_path / "__init__.py",
     ]
-    logger.debug(f"Checking entry point patterns: {[str(p) for p in entry_point_patterns]}")
+    logger.debug("Checking entry point patterns: %s", entry_point_patterns)
     for entry_point_path in entry_point_patterns:
-      if entry_point_path.exists():
-        logger.debug(f"Found entry point: {entry_point_path}")
-        plugin_info = _load_plugin_from_file(entry_point_path)
+      # one stat per candidate both tells whether it exists and gives the mtime the module cache is keyed on
+      mtime_ns = _mtime_ns(entry_point_path)
+      if mtime_ns is not None:
+        logger.debug("Found entry point: %s", entry_point_path)
+        plugin_info = _load_plugin_module(entry_point_path, mtime_ns)
         if plugin_info:
           return plugin_info
-    logger.debug(f"Searching recursively in {plugin_path}")
-    for init_file in plugin_path.rglob("__init__.py"):
-      logger.debug(f"Trying {init_file}")
+    logger.debug("Searching recursively in %s", plugin_path)
+    for init_file in islice(_iter_init_files(plugin_path), MAX_RECURSIVE_ENTRY_POINTS):
+      logger.debug("Trying %s", init_file)
       plugin_info = _load_plugin_from_file(init_file)
       if plugin_info:
         return plugin_info
@@ -78,21 +100,76 @@ def _load_plugin_from_path(plugin_path: Path) -> Optional["PluginMetadata"]:
   return None
 
 
+# breadth-first, so shallow packages (the usual plugin layout) are tried before anything nested
+def _iter_init_files(root: Path, max_depth: int = MAX_RECURSIVE_DEPTH) -> Iterator[Path]:
+  pending = deque([(os.fspath(root), 0)])
+  while pending:
+    dirpath, depth = pending.popleft()
+    try:
+      with os.scandir(dirpath) as it:
+        entries = list(it)
+    except OSError:
+      continue
+    for entry in entries:
+      if entry.name == "__init__.py" and entry.is_file():
+        yield Path(entry.path)
+        break
+    if depth < max_depth:
+      pending.extend((entry.path, depth + 1) for entry in entries if entry.name not in PRUNED_DIRS and entry.is_dir(follow_symlinks=False))
+
+
 def _extract_package_name(plugin_dir_name: str) -> str:
   return plugin_dir_name.replace("-", "_")
 
 
+def _mtime_ns(file_path: Path) -> int | None:
+  try:
+    return file_path.stat().st_mtime_ns
+  except OSError:
+    return None
+
+
 def _load_plugin_from_file(file_path: Path) -> Optional["PluginMetadata"]:
+  mtime_ns = _mtime_ns(file_path)
+  if mtime_ns is None:
+    logger.warning(f"Plugin file does not exist: {file_path}")
+    return None
+  return _load_plugin_module(file_path, mtime_ns)
+
+
+# one stable private name per plugin file, so two plugins sharing a directory name never replace each other's modules
+def _plugin_module_name(file_path: Path) -> str:
+  return f"_ezpz_plugin_{hashlib.blake2b(str(file_path.resolve()).encode(), digest_size=8).hexdigest()}"
+
+
+# keyed on mtime so rediscovering an unchanged file never executes its module twice
+@functools.lru_cache(maxsize=128)
+def _load_plugin_module(file_path: Path, _mtime_ns: int) -> Optional["PluginMetadata"]:
   try:
-    if not file_path.exists():
-      logger.warning(f"Plugin file does not exist: {file_path}")
+    source = file_path.read_bytes()
+    # only files that mention register_plugin can provide it, skip executing everything else
+    if b"register_plugin" not in source:
+      # most scanned __init__.py files are ordinary packages, skipping one is routine
+      logger.debug("Skipping %s, it does not mention register_plugin", file_path)
       return None
-    spec = importlib.util.spec_from_file_location(f"plugin_{file_path.stem}", file_path)
+    is_package = file_path.name == "__init__.py"
+    # a package __init__ gets its directory as search path, so its relative imports resolve without touching sys.path
+    spec = importlib.util.spec_from_file_location(
+      _plugin_module_name(file_path),
+      file_path,
+      submodule_search_locations=[str(file_path.parent)] if is_package else None,
+    )
     if spec is None or spec.loader is None:
       logger.warning(f"Could not create spec for {file_path}")
       return None
     module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
+    sys.modules[spec.name] = module
+    try:
+      # the source is already in memory from the check above, compile it directly instead of letting the loader read the file again
+      exec(compile(source, file_path, "exec"), module.__dict__)  # noqa: S102
+    except BaseException:
+      sys.modules.pop(spec.name, None)
+      raise
     if hasattr(module, "register_plugin"):
       register_func = module.register_plugin
       plugin_data: PluginMetadata = register_func()
@@ -1,15 +1,13 @@
 import logging
+import tomllib
+import functools
 from typing import TYPE_CHECKING, Any, ClassVar, Iterable, Optional, Generator
 from pathlib import Path
 from operator import attrgetter
 from itertools import chain, groupby
 
-import toml
-import libcst as cst
 from pydantic import Field, BaseModel
 
-from ezpz_pluginz.register_plugin_macro import PolarsPluginCollector
-
 if TYPE_CHECKING:
   from ezpz_pluginz.register_plugin_macro import PolarsPluginMacroMetadataPD
 
@@ -21,16 +19,31 @@ EZPZ_TOML_FILENAME = "ezpz.toml"
 EZPZ_PROJECT_LOCKFILE_FILENAME = "ezpz-lock.yaml"
 
 
+def _read_toml(path: Path) -> dict[str, Any]:
+  return _parse_toml(path, path.stat().st_mtime_ns)
+
+
+# keyed on mtime, so finding the config file and then loading it parses the TOML only once
+@functools.lru_cache(maxsize=16)
+def _parse_toml(path: Path, _mtime_ns: int) -> dict[str, Any]:
+  return tomllib.loads(path.read_text(encoding="utf-8"))
+
+
 def group_models_by_key[T: BaseModel](data: Iterable[T], key: str) -> dict[str, set[T]]:
   sorted_data = sorted(data, key=attrgetter(key))
   return {k: set(v) for k, v in groupby(sorted_data, key=attrgetter(key))}
 
 
 def _process_file(path: "Path") -> set["PolarsPluginMacroMetadataPD"]:
+  # libcst pulls in hundreds of modules, only pay for it once a source file is actually scanned
+  import libcst as cst  # noqa: PLC0415
+
+  from ezpz_pluginz.register_plugin_macro import PolarsPluginCollector  # noqa: PLC0415
+
   plugin_visitor = PolarsPluginCollector()
   cst.parse_module(path.read_text()).visit(plugin_visitor)
-  logger.debug(f"_process_file: {path}")
-  logger.debug(f"_process_file:return: {plugin_visitor.macro_data}")
+  logger.debug("_process_file: %s", path)
+  logger.debug("_process_file:return: %s", plugin_visitor.macro_data)
   return set(plugin_visitor.macro_data)
 
 
@@ -47,8 +60,7 @@ def process_includes(paths: Iterable["Path"]) -> "Generator[PolarsPluginMacroMet
 
 
 def get_plugins(project_toml_path: Path) -> dict[str, set["PolarsPluginMacroMetadataPD"]]:
-  ezpz_pluginz = EzpzPluginConfig.from_toml_path(project_toml_path)
-  return group_models_by_key(set(process_includes(ezpz_pluginz.include)), "polars_ns")
+  return EzpzPluginConfig.from_toml_path(project_toml_path).collect_plugins()
 
 
 class EzpzPluginConfig(BaseModel):
@@ -65,9 +77,7 @@ class EzpzPluginConfig(BaseModel):
   @staticmethod
   def from_toml_path(path: Path) -> "EzpzPluginConfig":
     try:
-      with path.open("r") as f:
-        data = toml.load(f)
-      toml_data = EzpzPluginToml(**data)
+      toml_data = EzpzPluginToml(**_read_toml(path))
 
       if path.name == EZPZ_TOML_FILENAME and toml_data.ezpz_pluginz:
         return toml_data.ezpz_pluginz
@@ -81,8 +91,10 @@ class EzpzPluginConfig(BaseModel):
 
   @staticmethod
   def get_plugins(project_toml_path: Path) -> dict[str, set["PolarsPluginMacroMetadataPD"]]:
-    ezpz_pluginz = EzpzPluginConfig.from_toml_path(project_toml_path)
-    return group_models_by_key(set(process_includes(ezpz_pluginz.include)), "polars_ns")
+    return EzpzPluginConfig.from_toml_path(project_toml_path).collect_plugins()
+
+  def collect_plugins(self) -> dict[str, set["PolarsPluginMacroMetadataPD"]]:
+    return group_models_by_key(set(process_includes(self.include)), "polars_ns")
 
 
 class EzpzPluginToml(BaseModel):
@@ -118,19 +130,18 @@ def find_ezpz_toml(start_path: Path | None = None) -> Optional[Path]:
   for parent in [current_dir, *list(current_dir.parents)]:
     config_file = parent / EZPZ_TOML_FILENAME
     if config_file.exists():
-      logger.debug(f"Found ezpz.toml at: {config_file}")
+      logger.debug("Found ezpz.toml at: %s", config_file)
       return config_file
 
     pyproject_file = parent / "pyproject.toml"
     if pyproject_file.exists():
       try:
-        with pyproject_file.open("r") as f:
-          data = toml.load(f)
+        data = _read_toml(pyproject_file)
         if data.get("tool", {}).get("ezpz"):
-          logger.debug(f"Found [tool.ezpz_pluginz] in pyproject.toml at: {pyproject_file}")
+          logger.debug("Found [tool.ezpz_pluginz] in pyproject.toml at: %s", pyproject_file)
           return pyproject_file
       except Exception as e:
-        logger.debug(f"Error checking pyproject.toml at {pyproject_file}: {e}")
+        logger.debug("Error checking pyproject.toml at %s: %s", pyproject_file, e)
         continue
 
   return None
@@ -0,0 +1,104 @@
+# ruff: noqa: S101
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from ezpz_pluginz.registry.reg import local
+from ezpz_pluginz.registry.models import PluginResponse
+
+if TYPE_CHECKING:
+  from pathlib import Path
+
+
+def make_plugin(name: str, package_name: str, aliases: list[str]) -> PluginResponse:
+  return PluginResponse(
+    id=name,
+    created_at="",
+    updated_at="",
+    name=name,
+    package_name=package_name,
+    description=f"{name} description",
+    aliases=aliases,
+    version="0.1.0",
+    author="Summit Sailors",
+    category="Technical analysis",
+    homepage="https://example.com",
+    metadata_={
+      "license": "MIT",
+      "python_version": ">=3.14",
+      "documentation": "https://example.com/docs",
+      "support_email": "support@example.com",
+    },
+  )
+
+
+@pytest.fixture
+def registry(tmp_path: "Path", monkeypatch: pytest.MonkeyPatch) -> local.LocalPluginRegistry:
+  registry_file = tmp_path / "plugins.json"
+  plugins = [make_plugin("Talib", "ezpz-talib", ["TA"]), make_plugin("Rolling", "ezpz-rolling", [])]
+  registry_file.write_text(json.dumps({"plugins": [plugin.model_dump(mode="json") for plugin in plugins]}))
+  monkeypatch.setattr(local, "LOCAL_REGISTRY_DIR", tmp_path)
+  monkeypatch.setattr(local, "LOCAL_REGISTRY_FILE", registry_file)
+  return local.LocalPluginRegistry()
+
+
+def test_is_plugin_registered(registry: local.LocalPluginRegistry) -> None:
+  assert registry.is_plugin_registered("talib")
+  assert registry.is_plugin_registered("EZPZ-TALIB")
+  assert registry.is_plugin_registered("ta")
+  assert not registry.is_plugin_registered("ezpz-missing")
+
+
+def test_remove_plugin_drops_lookup_keys(registry: local.LocalPluginRegistry) -> None:
+  talib = registry.get_plugin("talib")
+  assert talib is not None
+  registry.remove_plugin_from_local_registry(talib)
+  assert not registry.is_plugin_registered("ezpz-talib")
+  assert not registry.is_plugin_registered("ta")
+  assert [plugin.name for plugin in registry.list_plugins()] == ["Rolling"]
+  assert [plugin.name for plugin in local.LocalPluginRegistry().list_plugins()] == ["Rolling"]
+
+
+def test_search_plugins(registry: local.LocalPluginRegistry) -> None:
+  assert [plugin.name for plugin in registry.search_plugins("ROLL")] == ["Rolling"]
+  assert [plugin.name for plugin in registry.search_plugins("ta")] == ["Talib"]
+  assert {plugin.name for plugin in registry.search_plugins("summit")} == {"Talib", "Rolling"}
+  # only the name, description, author and aliases are searched, never the category
+  assert not registry.search_plugins("technical")
+  assert not registry.search_plugins("talib description rolling")
+
+
+def test_saved_registry_round_trips_as_plain_json(registry: local.LocalPluginRegistry) -> None:
+  rolling = registry.get_plugin("rolling")
+  assert rolling is not None
+  registry.remove_plugin_from_local_registry(rolling)
+  # other tools read this file with json.load, it must stay plain JSON
+  data = json.loads(local.LOCAL_REGISTRY_FILE.read_text(encoding="utf-8"))
+  assert [plugin["name"] for plugin in data["plugins"]] == ["Talib"]
+  assert not local.LOCAL_REGISTRY_FILE.with_suffix(".json.tmp").exists()
+  reloaded = local.LocalPluginRegistry()
+  assert reloaded.get_plugin("ta") == registry.get_plugin("ta")
+  assert reloaded.is_plugin_registered("ezpz-talib")
+
+
+def test_loads_legacy_registry(tmp_path: "Path", monkeypatch: pytest.MonkeyPatch) -> None:
+  registry_file = tmp_path / "plugins.json"
+  plugins = [make_plugin("Talib", "ezpz-talib", ["TA"])]
+  # the format written by earlier versions: indented, no etag or digest
+  registry_file.write_text(json.dumps({"timestamp": 1.0, "plugins": [plugin.model_dump(mode="json") for plugin in plugins]}, indent=2))
+  monkeypatch.setattr(local, "LOCAL_REGISTRY_DIR", tmp_path)
+  monkeypatch.setattr(local, "LOCAL_REGISTRY_FILE", registry_file)
+  registry = local.LocalPluginRegistry()
+  assert [plugin.name for plugin in registry.list_plugins()] == ["Talib"]
+  assert registry.is_plugin_registered("ta")
+
+
+@pytest.mark.parametrize("content", [b'{"plugins": 5}', b"[1, 2]", b"not json"])
+def test_malformed_registry_loads_empty(tmp_path: "Path", monkeypatch: pytest.MonkeyPatch, content: bytes) -> None:
+  registry_file = tmp_path / "plugins.json"
+  registry_file.write_bytes(content)
+  monkeypatch.setattr(local, "LOCAL_REGISTRY_DIR", tmp_path)
+  monkeypatch.setattr(local, "LOCAL_REGISTRY_FILE", registry_file)
+  assert local.LocalPluginRegistry().list_plugins() == []
@@ -0,0 +1,70 @@
+# ruff: noqa: S101
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from ezpz_pluginz import PATCH_HASHES_FILENAME, _digest, _is_mount_current, _save_patch_hashes
+
+if TYPE_CHECKING:
+  from pathlib import Path
+
+LOCKFILE_HASH = "lockfile-v1"
+PATCHED_SOURCE = b"# patched polars namespace\n"
+
+
+@pytest.fixture
+def mounted(tmp_path: "Path") -> tuple["Path", "Path", "Path"]:
+  """Lays out a finished mount: a patched polars file, its .patched copy and the recorded hashes."""
+  target = tmp_path / "site-packages" / "frame.py"
+  target.parent.mkdir()
+  patched_dir = tmp_path / ".patched"
+  patched_dir.mkdir()
+  patched_copy = patched_dir / "dataframe.py"
+  for path in (target, patched_copy):
+    path.write_bytes(PATCHED_SOURCE)
+  _save_patch_hashes(patched_dir, LOCKFILE_HASH, {str(target): _digest(PATCHED_SOURCE), str(patched_copy): _digest(PATCHED_SOURCE)})
+  return patched_dir, target, patched_copy
+
+
+def test_unchanged_mount_is_skipped(mounted: tuple["Path", "Path", "Path"]) -> None:
+  patched_dir, target, _ = mounted
+  assert _is_mount_current(patched_dir, LOCKFILE_HASH, [target])
+
+
+def test_lockfile_change_remounts(mounted: tuple["Path", "Path", "Path"]) -> None:
+  patched_dir, target, _ = mounted
+  assert not _is_mount_current(patched_dir, "lockfile-v2", [target])
+
+
+def test_target_change_remounts(mounted: tuple["Path", "Path", "Path"]) -> None:
+  patched_dir, target, _ = mounted
+  # e.g. a polars reinstall overwrote the patched namespace file
+  target.write_bytes(b"# pristine polars namespace\n")
+  assert not _is_mount_current(patched_dir, LOCKFILE_HASH, [target])
+
+
+def test_new_target_remounts(mounted: tuple["Path", "Path", "Path"], tmp_path: "Path") -> None:
+  patched_dir, target, _ = mounted
+  assert not _is_mount_current(patched_dir, LOCKFILE_HASH, [target, tmp_path / "site-packages" / "series.py"])
+
+
+def test_edited_patched_copy_remounts(mounted: tuple["Path", "Path", "Path"]) -> None:
+  patched_dir, target, patched_copy = mounted
+  patched_copy.write_bytes(b"# hand edited\n")
+  assert not _is_mount_current(patched_dir, LOCKFILE_HASH, [target])
+
+
+def test_deleted_patched_copy_remounts(mounted: tuple["Path", "Path", "Path"]) -> None:
+  patched_dir, target, patched_copy = mounted
+  patched_copy.unlink()
+  assert (patched_dir / PATCH_HASHES_FILENAME).exists()
+  assert not _is_mount_current(patched_dir, LOCKFILE_HASH, [target])
+
+
+def test_missing_or_corrupt_hashes_remount(mounted: tuple["Path", "Path", "Path"]) -> None:
+  patched_dir, target, _ = mounted
+  (patched_dir / PATCH_HASHES_FILENAME).write_text("not json")
+  assert not _is_mount_current(patched_dir, LOCKFILE_HASH, [target])
+  (patched_dir / PATCH_HASHES_FILENAME).unlink()
+  assert not _is_mount_current(patched_dir, LOCKFILE_HASH, [target])
@@ -0,0 +1,136 @@
+# ruff: noqa: S101
+
+import json
+import threading
+from typing import TYPE_CHECKING, Any
+from functools import partial
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from ezpz_pluginz.registry.reg import local, remote
+from ezpz_pluginz.registry.models import PluginResponse
+from ezpz_pluginz.registry.exceptions import PluginRegistryError
+
+if TYPE_CHECKING:
+  from pathlib import Path
+
+
+def make_plugin(name: str, version: str = "0.1.0") -> dict[str, Any]:
+  return PluginResponse(
+    id=name,
+    created_at="",
+    updated_at="",
+    name=name,
+    package_name=f"ezpz-{name.lower()}",
+    description=f"{name} description",
+    version=version,
+    author="Summit Sailors",
+    category="Technical analysis",
+    homepage="https://example.com",
+    metadata_={
+      "license": "MIT",
+      "python_version": ">=3.14",
+      "documentation": "https://example.com/docs",
+      "support_email": "support@example.com",
+    },
+  ).model_dump(mode="json")
+
+
+class FakeRegistry:
+  """Serves `pages` from /plugins, answering page 1 with 304 when If-None-Match matches its ETag."""
+
+  def __init__(self, pages: list[list[dict[str, Any]]], etag: str = '"v1"') -> None:
+    self.pages = pages
+    self.etag = etag
+    self.requests: list[tuple[int, str | None]] = []
+
+  def __call__(self, request: httpx.Request) -> httpx.Response:
+    page = int(parse_qs(request.content.decode())["page"][0])
+    if_none_match = request.headers.get("if-none-match")
+    self.requests.append((page, if_none_match))
+    if page == 1 and if_none_match == self.etag:
+      return httpx.Response(304)
+    body = {"plugins": self.pages[page - 1], "total_pages": len(self.pages)}
+    return httpx.Response(200, json=body, headers={"etag": self.etag})
+
+
+@pytest.fixture
+def registry_file(tmp_path: "Path", monkeypatch: pytest.MonkeyPatch) -> "Path":
+  registry_file = tmp_path / "plugins.json"
+  monkeypatch.setattr(local, "LOCAL_REGISTRY_DIR", tmp_path)
+  monkeypatch.setattr(local, "LOCAL_REGISTRY_FILE", registry_file)
+  # every refresh goes to the remote, the TTL is covered by the stored timestamp and not under test here
+  monkeypatch.setattr(local, "LOCAL_REGISTRY_TTL", 0.0)
+  return registry_file
+
+
+def serve(monkeypatch: pytest.MonkeyPatch, fake: FakeRegistry) -> None:
+  monkeypatch.setattr(remote, "PluginRegistryAPI", partial(remote.PluginRegistryAPI, "http://registry.test", transport=httpx.MockTransport(fake)))
+
+
+def test_unchanged_single_page_registry_is_revalidated(registry_file: "Path", monkeypatch: pytest.MonkeyPatch) -> None:
+  fake = FakeRegistry([[make_plugin("Talib")]])
+  serve(monkeypatch, fake)
+  assert local.LocalPluginRegistry().fetch_and_update_registry()
+  assert json.loads(registry_file.read_text())["etag"] == '"v1"'
+
+  registry = local.LocalPluginRegistry()
+  assert registry.fetch_and_update_registry()
+  assert fake.requests[-1] == (1, '"v1"')
+  assert [plugin.name for plugin in registry.list_plugins()] == ["Talib"]
+
+
+def test_forced_refresh_skips_revalidation(registry_file: "Path", monkeypatch: pytest.MonkeyPatch) -> None:
+  fake = FakeRegistry([[make_plugin("Talib")]])
+  serve(monkeypatch, fake)
+  assert local.LocalPluginRegistry().fetch_and_update_registry()
+  fake.pages = [[make_plugin("Talib", "0.2.0")]]
+
+  registry = local.LocalPluginRegistry()
+  assert registry.fetch_and_update_registry(force=True)
+  assert fake.requests[-1] == (1, None)
+  talib = registry.get_plugin("talib")
+  assert talib is not None
+  assert talib.version == "0.2.0"
+
+
+def test_multi_page_registry_is_never_revalidated_by_first_page(registry_file: "Path", monkeypatch: pytest.MonkeyPatch) -> None:
+  fake = FakeRegistry([[make_plugin("Talib")], [make_plugin("Rolling")]])
+  serve(monkeypatch, fake)
+  assert local.LocalPluginRegistry().fetch_and_update_registry()
+  # the page 1 ETag says nothing about page 2, so it is not kept
+  assert json.loads(registry_file.read_text())["etag"] is None
+
+  fake.pages[1] = [make_plugin("Rolling"), make_plugin("Ewm")]
+  registry = local.LocalPluginRegistry()
+  assert registry.fetch_and_update_registry()
+  assert (1, '"v1"') not in fake.requests
+  assert {plugin.name for plugin in registry.list_plugins()} == {"Talib", "Rolling", "Ewm"}
+
+
+@pytest.mark.parametrize("body", [[1, 2], {"plugins": 5}, {"plugins": [], "total_pages": [2]}])
+def test_malformed_page_is_a_registry_error(body: object) -> None:
+  transport = httpx.MockTransport(lambda _: httpx.Response(200, json=body))
+  with remote.PluginRegistryAPI("http://registry.test", transport=transport) as api, pytest.raises(PluginRegistryError):
+    api.fetch_plugins()
+
+
+def test_background_refresh_does_not_hold_up_exit(registry_file: "Path", monkeypatch: pytest.MonkeyPatch) -> None:
+  fake = FakeRegistry([[make_plugin("Talib")]])
+  release = threading.Event()
+
+  def stalled(request: httpx.Request) -> httpx.Response:
+    release.wait()
+    return fake(request)
+
+  monkeypatch.setattr(remote, "PluginRegistryAPI", partial(remote.PluginRegistryAPI, "http://registry.test", transport=httpx.MockTransport(stalled)))
+  refresh = local.LocalPluginRegistry().refresh_in_background()
+  # a caller that exits early must not wait on the remote, so the refresh runs on a daemon thread
+  (thread,) = (thread for thread in threading.enumerate() if thread.name == "ezpz-registry-refresh")
+  assert thread.daemon
+  assert not refresh.done()
+  release.set()
+  assert refresh.result(timeout=5)
+  assert json.loads(registry_file.read_text())["plugins"][0]["name"] == "Talib"